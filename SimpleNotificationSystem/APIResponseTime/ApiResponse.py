@@ -1,7 +1,224 @@
+import asyncio
+import math
 import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from statistics import median
+from threading import Lock
+
+
+def _timed_call(func, args, kwargs):
+    # Module-level so process pools can pickle it. perf_counter_ns is CLOCK_MONOTONIC on
+    # Linux and macOS, so timestamps taken in a worker process line up with the parent's.
+    start = time.perf_counter_ns()
+    try:
+        func(*args, **kwargs)
+        ok = True
+    except Exception:
+        ok = False
+    return start, time.perf_counter_ns(), ok
+
+
+def _closed_loop_worker(func, args, kwargs, iterations, deadline_ns, streaming):
+    # One pool worker calling func back-to-back; returns its own sink so the parent only
+    # has to merge, never to time individual calls across the pool boundary.
+    sink = _HistogramSink() if streaming else _ListSink()
+    calls = 0
+    while (iterations is None or calls < iterations) and (deadline_ns is None or time.perf_counter_ns() < deadline_ns):
+        start, end, ok = _timed_call(func, args, kwargs)
+        sink.add(start, start, end, ok)
+        calls += 1
+    return sink
+
+
+def _percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list.
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _summarize(latencies_ns):
+    if not latencies_ns:
+        return {"count": 0, "min": None, "max": None, "avg": None, "median": None,
+                "p90": None, "p99": None, "p999": None}
+    ordered = sorted(latencies_ns)
+    to_seconds = 1e-9
+    return {
+        "count": len(ordered),
+        "min": ordered[0] * to_seconds,
+        "max": ordered[-1] * to_seconds,
+        "avg": sum(ordered) / len(ordered) * to_seconds,
+        "median": median(ordered) * to_seconds,
+        "p90": _percentile(ordered, 0.90) * to_seconds,
+        "p99": _percentile(ordered, 0.99) * to_seconds,
+        "p999": _percentile(ordered, 0.999) * to_seconds,
+    }
+
+
+class LatencyHistogram:
+    """
+    Constant-memory HDR-style histogram of nanosecond latencies.
+
+    Values below 2 * 10**significant_digits are counted exactly; above that each power of two
+    is split into the same number of linear sub-buckets, so every recorded value keeps
+    `significant_digits` decimal digits of precision. Memory depends only on the configured
+    range (about 300 KB for the defaults), never on the number of samples. Histograms with
+    the same configuration can be merged, e.g. one per worker thread or process.
+    """
+
+    def __init__(self, significant_digits = 3, highest_trackable_ns = 24 * 3600 * 10**9):
+        self.significant_digits = significant_digits
+        self.highest_trackable_ns = highest_trackable_ns
+        self.sub_bucket_bits = (2 * 10 ** significant_digits - 1).bit_length()
+        self.sub_bucket_half = 1 << (self.sub_bucket_bits - 1)
+        self.max_index = self._index(highest_trackable_ns)
+        self.counts = array("q", bytes(8 * (self.max_index + 1)))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return shift * self.sub_bucket_half + (value >> shift)
+
+    def _highest_equivalent(self, index):
+        if index < 2 * self.sub_bucket_half:
+            return index
+        shift = index // self.sub_bucket_half - 1
+        sub_bucket = index - shift * self.sub_bucket_half
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value_ns, count = 1):
+        value_ns = min(max(0, int(value_ns)), self.highest_trackable_ns)
+        self.counts[self._index(value_ns)] += count
+        self.count += count
+        self.total += value_ns * count
+        if self.min is None or value_ns < self.min:
+            self.min = value_ns
+        if self.max is None or value_ns > self.max:
+            self.max = value_ns
+
+    def merge(self, other):
+        if (other.significant_digits, other.highest_trackable_ns) != (self.significant_digits, self.highest_trackable_ns):
+            raise ValueError("can only merge histograms with the same configuration")
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merged(cls, histograms):
+        histograms = list(histograms)
+        result = cls(histograms[0].significant_digits, histograms[0].highest_trackable_ns)
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+    def percentiles(self, fractions):
+        """
+        Returns the value (ns) at each requested fraction in one pass over the buckets.
+        """
+        if not self.count:
+            return [None for _ in fractions]
+        targets = sorted((max(1, math.ceil(fraction * self.count)), position)
+                         for position, fraction in enumerate(fractions))
+        results = [None] * len(fractions)
+        seen = 0
+        target = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while target < len(targets) and seen >= targets[target][0]:
+                results[targets[target][1]] = min(self._highest_equivalent(index), self.max)
+                target += 1
+            if target == len(targets):
+                break
+        return results
+
+    def percentile(self, fraction):
+        return self.percentiles([fraction])[0]
+
+    def __repr__(self):
+        return f"LatencyHistogram(count={self.count}, min={self.min}, max={self.max})"
+
+    def summary(self):
+        """
+        Same keys as the sample-based statistics, in seconds.
+        """
+        if not self.count:
+            return _summarize([])
+        p50, p90, p99, p999 = self.percentiles([0.5, 0.9, 0.99, 0.999])
+        to_seconds = 1e-9
+        return {
+            "count": self.count,
+            "min": self.min * to_seconds,
+            "max": self.max * to_seconds,
+            "avg": self.total / self.count * to_seconds,
+            "median": p50 * to_seconds,
+            "p90": p90 * to_seconds,
+            "p99": p99 * to_seconds,
+            "p999": p999 * to_seconds,
+        }
+
+
+class _ListSink:
+    # Keeps every sample; exact, but memory grows with the number of calls.
+    def __init__(self):
+        self.records = []
+
+    def add(self, intended, start, end, ok):
+        self.records.append((intended, start, end, ok))
+
+    def merge(self, other):
+        self.records.extend(other.records)
+
+    def report(self):
+        successful = [record for record in self.records if record[3]]
+        latencies = [end - start for _, start, end, _ in successful]
+        histogram = LatencyHistogram()
+        for latency in latencies:
+            histogram.record(latency)
+        return (_summarize(latencies),
+                _summarize([end - intended for intended, _, end, _ in successful]),
+                len(self.records) - len(successful), histogram)
+
+
+class _HistogramSink:
+    # Constant memory: latencies go straight into histograms.
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.corrected = LatencyHistogram()
+        self.errors = 0
+
+    def add(self, intended, start, end, ok):
+        if ok:
+            self.latency.record(end - start)
+            self.corrected.record(end - intended)
+        else:
+            self.errors += 1
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.corrected.merge(other.corrected)
+        self.errors += other.errors
+
+    def report(self):
+        return self.latency.summary(), self.corrected.summary(), self.errors, self.latency
+
 
 class APIResponseTester:
+    MODES = ("thread", "process", "asyncio")
+
     def __init__(self):
         pass
 
@@ -23,21 +240,168 @@ class APIResponseTester:
         }
         return stats
 
+    def run_load_test(self, func, *args, iterations=1000, duration=None, concurrency=8,
+                      mode="thread", target_rps=None, warmup=10, streaming=False, **kwargs):
+        """
+        Drives `func` from a thread pool, a process pool or asyncio tasks and times every call
+        with perf_counter_ns.
+
+        :param iterations: Number of timed calls (after warmup); ignored when duration is set.
+        :param duration: Run for this many seconds instead of a fixed number of calls.
+        :param concurrency: Worker threads/processes, or maximum in-flight coroutines.
+        :param mode: "thread", "process" (func must be picklable) or "asyncio" (func must be
+                     a coroutine function).
+        :param target_rps: None for a closed loop (each worker starts its next call as soon
+                           as the previous one finishes). A number switches to an open loop:
+                           calls are scheduled at fixed 1/target_rps intervals whether or not
+                           earlier calls have finished.
+        :param warmup: Untimed calls made first to warm caches, pools and connections.
+        :param streaming: Record into constant-memory LatencyHistograms (merged across
+                          workers) instead of keeping every sample; use for soak tests.
+
+        The latency LatencyHistogram is always returned under "histogram" so results can be
+        persisted and compared (see BenchmarkResults.py).
+
+        Returns the run_test statistics (in seconds) plus p90/p99/p999, errors, duration and
+        throughput. Open-loop runs also report "corrected": latencies measured from each
+        call's scheduled start rather than its actual start, which corrects for coordinated
+        omission (a stalled system delaying the very requests that would have measured it).
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}")
+        if duration is not None:
+            iterations = int(duration * target_rps) if target_rps else None
+        sink = _HistogramSink() if streaming else _ListSink()
+        begin = time.perf_counter_ns()
+        if mode == "asyncio":
+            if not asyncio.iscoroutinefunction(func):
+                raise TypeError("asyncio mode needs a coroutine function")
+            begin = asyncio.run(self._run_async(func, args, kwargs, iterations, duration, concurrency,
+                                                target_rps, warmup, sink))
+        else:
+            executor_class = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+            with executor_class(max_workers=concurrency) as executor:
+                for future in [executor.submit(_timed_call, func, args, kwargs) for _ in range(warmup)]:
+                    future.result()
+                begin = time.perf_counter_ns()
+                if target_rps:
+                    self._run_open_loop(executor, func, args, kwargs, iterations, target_rps, sink)
+                else:
+                    self._run_closed_loop(executor, func, args, kwargs, iterations, duration,
+                                          concurrency, streaming, sink)
+            # Leaving the executor waits for every call and completion callback.
+        elapsed = (time.perf_counter_ns() - begin) / 1e9
+
+        stats, corrected, errors, histogram = sink.report()
+        stats["errors"] = errors
+        stats["duration"] = elapsed
+        stats["throughput"] = (stats["count"] + errors) / elapsed if elapsed else None
+        if target_rps:
+            stats["target_rps"] = target_rps
+            stats["corrected"] = corrected
+        stats["histogram"] = histogram
+        return stats
+
+    def _run_closed_loop(self, executor, func, args, kwargs, iterations, duration, concurrency,
+                         streaming, sink):
+        deadline_ns = time.perf_counter_ns() + int(duration * 1e9) if duration is not None else None
+        futures = []
+        for worker in range(concurrency):
+            share = None
+            if iterations is not None:
+                share = iterations // concurrency + (1 if worker < iterations % concurrency else 0)
+            futures.append(executor.submit(_closed_loop_worker, func, args, kwargs, share,
+                                           deadline_ns, streaming))
+        for future in futures:
+            sink.merge(future.result())
+
+    def _run_open_loop(self, executor, func, args, kwargs, iterations, target_rps, sink):
+        lock = Lock()
+
+        def record(future, intended):
+            start, end, ok = future.result()
+            with lock:
+                sink.add(intended, start, end, ok)
+
+        begin = time.perf_counter_ns()
+        interval_ns = int(1e9 / target_rps)
+        for i in range(iterations):
+            intended = begin + i * interval_ns
+            ahead = intended - time.perf_counter_ns()
+            if ahead > 0:
+                time.sleep(ahead / 1e9)
+            future = executor.submit(_timed_call, func, args, kwargs)
+            # Nothing holds on to the future, so memory stays flat on long runs.
+            future.add_done_callback(lambda done, intended=intended: record(done, intended))
+
+    async def _run_async(self, func, args, kwargs, iterations, duration, concurrency, target_rps,
+                         warmup, sink):
+        gate = asyncio.Semaphore(concurrency)
+
+        async def timed(intended, record = True):
+            async with gate:
+                start = time.perf_counter_ns()
+                try:
+                    await func(*args, **kwargs)
+                    ok = True
+                except Exception:
+                    ok = False
+                if record:
+                    sink.add(start if intended is None else intended, start, time.perf_counter_ns(), ok)
+
+        async def closed_loop_worker(share, deadline_ns):
+            calls = 0
+            while (share is None or calls < share) and (deadline_ns is None or time.perf_counter_ns() < deadline_ns):
+                await timed(None)
+                calls += 1
+
+        await asyncio.gather(*(timed(None, record=False) for _ in range(warmup)))
+
+        begin = time.perf_counter_ns()
+        if target_rps:
+            in_flight = set()
+            interval_ns = int(1e9 / target_rps)
+            for i in range(iterations):
+                intended = begin + i * interval_ns
+                ahead = intended - time.perf_counter_ns()
+                if ahead > 0:
+                    await asyncio.sleep(ahead / 1e9)
+                task = asyncio.ensure_future(timed(intended))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            await asyncio.gather(*in_flight)
+        else:
+            deadline_ns = begin + int(duration * 1e9) if duration is not None else None
+            shares = [None] * concurrency if iterations is None else [
+                iterations // concurrency + (1 if worker < iterations % concurrency else 0)
+                for worker in range(concurrency)]
+            await asyncio.gather(*(closed_loop_worker(share, deadline_ns) for share in shares))
+        return begin
+
 # --------------------------
 # Example Usage & Test Cases
 # --------------------------
-if __name__ == "__main__":
-    tester = APIResponseTester()
+def get_users():
+    # Simulate processing delay for a GET /users API call.
+    time.sleep(0.1)
+    return ["user1", "user2", "user3"]
 
-    def get_users():
-        # Simulate processing delay for a GET /users API call.
-        time.sleep(0.1)
-        return ["user1", "user2", "user3"]
+def create_order(sleep_time):
+    # Simulate processing delay based on the sleep_time parameter.
+    time.sleep(sleep_time)
+    return {"order_id": 12345}
 
-    def create_order(sleep_time):
-        # Simulate processing delay based on the sleep_time parameter.
-        time.sleep(sleep_time)
-        return {"order_id": 12345}
+def flaky_search():
+    # Usually fast, but stalls for 200ms on every 50th call.
+    flaky_search.calls = getattr(flaky_search, "calls", 0) + 1
+    time.sleep(0.2 if flaky_search.calls % 50 == 0 else 0.001)
+
+async def async_get_users():
+    await asyncio.sleep(0.01)
+    return ["user1", "user2", "user3"]
+
+if __name__ == "__main__":
+    tester = APIResponseTester()
 
     # Run tests for get_users function for 10 iterations.
     stats_get_users = tester.run_test(get_users, iterations=10)
@@ -46,3 +410,28 @@ if __name__ == "__main__":
     # Run tests for create_order function for 10 iterations.
     stats_create_order = tester.run_test(create_order, iterations=10, sleep_time=0.3)
     print("Stats for POST /orders:", stats_create_order)
+
+    # Closed-loop load from 16 threads.
+    stats_threads = tester.run_load_test(create_order, iterations=200, concurrency=16, sleep_time=0.01)
+    print("Closed loop, 16 threads:", stats_threads)
+
+    # Closed-loop load from 4 worker processes.
+    stats_processes = tester.run_load_test(create_order, iterations=40, concurrency=4, mode="process",
+                                           sleep_time=0.01)
+    print("Closed loop, 4 processes:", stats_processes)
+
+    # 1000 concurrent coroutines.
+    stats_async = tester.run_load_test(async_get_users, iterations=5000, concurrency=1000, mode="asyncio")
+    print("Closed loop, asyncio:", stats_async)
+
+    # Open loop at 200 req/s with a single worker: the stalls delay every queued call, which
+    # only the coordinated-omission-corrected numbers show.
+    stats_open = tester.run_load_test(flaky_search, iterations=400, concurrency=1, target_rps=200, warmup=0)
+    print(f"Open loop p99: measured {stats_open['p99'] * 1000:.1f}ms, "
+          f"corrected {stats_open['corrected']['p99'] * 1000:.1f}ms")
+
+    # Constant-memory soak run: two threads for 2 seconds, merged into one histogram.
+    stats_soak = tester.run_load_test(flaky_search, duration=2, concurrency=2, streaming=True)
+    print(f"Soak run: {stats_soak['count']} calls, p50={stats_soak['median'] * 1000:.2f}ms "
+          f"p99={stats_soak['p99'] * 1000:.2f}ms p99.9={stats_soak['p999'] * 1000:.2f}ms "
+          f"max={stats_soak['max'] * 1000:.2f}ms")
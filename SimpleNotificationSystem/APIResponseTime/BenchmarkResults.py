@@ -0,0 +1,212 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from array import array
+
+from ApiResponse import LatencyHistogram
+
+# A result is two files side by side:
+#   <path>.json  metadata, summary statistics and the histogram configuration
+#   <path>.hist  the non-empty histogram buckets as little-endian int64 (index, count) pairs
+SUMMARY_KEYS = ("count", "min", "median", "p90", "p99", "p999", "max", "avg", "throughput", "errors")
+
+
+def save_result(stats, path, **metadata):
+    """
+    Persists a run_load_test result. Extra keyword arguments (commit, host, ...) are stored
+    as metadata.
+    """
+    histogram = stats["histogram"]
+    pairs = array("q")
+    for index, count in enumerate(histogram.counts):
+        if count:
+            pairs.append(index)
+            pairs.append(count)
+    if sys.byteorder != "little":
+        pairs.byteswap()
+    with open(path + ".hist", "wb") as hist_file:
+        pairs.tofile(hist_file)
+
+    document = {
+        "metadata": dict(metadata, saved_at=time.strftime("%Y-%m-%dT%H:%M:%S%z")),
+        "stats": {key: value for key, value in stats.items() if key != "histogram"},
+        "histogram": {
+            "significant_digits": histogram.significant_digits,
+            "highest_trackable_ns": histogram.highest_trackable_ns,
+            "count": histogram.count,
+            "total": histogram.total,
+            "min": histogram.min,
+            "max": histogram.max,
+        },
+    }
+    with open(path + ".json", "w") as json_file:
+        json.dump(document, json_file, indent=2)
+
+
+def load_result(path):
+    """
+    Returns (document, LatencyHistogram) for a result saved with save_result. `path` may
+    include the .json/.hist suffix.
+    """
+    path = os.path.splitext(path)[0] if path.endswith((".json", ".hist")) else path
+    with open(path + ".json") as json_file:
+        document = json.load(json_file)
+    config = document["histogram"]
+    histogram = LatencyHistogram(config["significant_digits"], config["highest_trackable_ns"])
+    pairs = array("q")
+    with open(path + ".hist", "rb") as hist_file:
+        pairs.frombytes(hist_file.read())
+    if sys.byteorder != "little":
+        pairs.byteswap()
+    for position in range(0, len(pairs), 2):
+        histogram.counts[pairs[position]] = pairs[position + 1]
+    histogram.count = config["count"]
+    histogram.total = config["total"]
+    histogram.min = config["min"]
+    histogram.max = config["max"]
+    return document, histogram
+
+
+def _normal_sf(z):
+    # P(Z > z) for a standard normal.
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def mann_whitney(base, new):
+    """
+    One-sided Mann-Whitney U test that `new` latencies are stochastically larger than `base`,
+    computed directly from histogram buckets (each bucket is a tie block). Returns
+    (P(new > base), p-value), or (None, 1.0) when either histogram is empty.
+    """
+    n_base, n_new = base.count, new.count
+    if not n_base or not n_new:
+        return None, 1.0
+    total = n_base + n_new
+    rank = 0
+    rank_sum_new = 0.0
+    tie_term = 0
+    for base_count, new_count in zip(base.counts, new.counts):
+        block = base_count + new_count
+        if not block:
+            continue
+        average_rank = rank + (block + 1) / 2
+        rank_sum_new += new_count * average_rank
+        tie_term += block ** 3 - block
+        rank += block
+    u = rank_sum_new - n_new * (n_new + 1) / 2
+    mean = n_base * n_new / 2
+    variance = n_base * n_new / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return u / (n_base * n_new), 1.0
+    return u / (n_base * n_new), _normal_sf((u - mean) / math.sqrt(variance))
+
+
+def two_proportion_test(base_hits, base_total, new_hits, new_total):
+    """
+    One-sided z-test that the new proportion is larger. Returns (base share, new share,
+    p-value).
+    """
+    base_share = base_hits / base_total
+    new_share = new_hits / new_total
+    pooled = (base_hits + new_hits) / (base_total + new_total)
+    standard_error = math.sqrt(pooled * (1 - pooled) * (1 / base_total + 1 / new_total))
+    if standard_error == 0:
+        return base_share, new_share, 1.0
+    return base_share, new_share, _normal_sf((new_share - base_share) / standard_error)
+
+
+def tail_exceedance_test(base, new, fraction = 0.99):
+    """
+    Two-proportion z-test on the share of samples above the baseline's `fraction` quantile.
+    If the tail did not move, both runs put about 1 - fraction of their samples above it.
+    Returns (base share, new share, one-sided p-value that the new share is larger), or
+    (None, None, 1.0) when either histogram is empty.
+    """
+    if not base.count or not new.count:
+        return None, None, 1.0
+    threshold_index = base._index(base.percentile(fraction))
+    base_above = sum(base.counts[threshold_index + 1:])
+    new_above = sum(new.counts[threshold_index + 1:])
+    return two_proportion_test(base_above, base.count, new_above, new.count)
+
+
+def compare_results(base_path, new_path, threshold = 0.10, alpha = 0.01, out = sys.stdout):
+    """
+    Prints a diff of two saved runs and returns True when p99 or the error rate regressed by
+    more than `threshold` (relative) and the matching test is significant at `alpha`. A new
+    run with no requests at all counts as a regression. Raises ValueError when the two
+    histograms were recorded with different configurations.
+    """
+    base_document, base = load_result(base_path)
+    new_document, new = load_result(new_path)
+    base_stats, new_stats = base_document["stats"], new_document["stats"]
+    if (base.significant_digits, base.highest_trackable_ns) != (new.significant_digits, new.highest_trackable_ns):
+        raise ValueError(f"histogram configurations differ: base has significant_digits="
+                         f"{base.significant_digits}, highest_trackable_ns={base.highest_trackable_ns}; new has "
+                         f"significant_digits={new.significant_digits}, highest_trackable_ns={new.highest_trackable_ns}")
+
+    print(f"{'metric':<12}{'base':>14}{'new':>14}{'change':>10}", file=out)
+    for key in SUMMARY_KEYS:
+        old_value, new_value = base_stats.get(key), new_stats.get(key)
+        if old_value is None or new_value is None:
+            continue
+        change = f"{(new_value - old_value) / old_value:+.1%}" if old_value else "n/a"
+        print(f"{key:<12}{old_value:>14.6g}{new_value:>14.6g}{change:>10}", file=out)
+
+    # Errors: failed requests never reach the histogram, so compare their share separately.
+    base_errors, new_errors = base_stats.get("errors") or 0, new_stats.get("errors") or 0
+    base_requests, new_requests = base.count + base_errors, new.count + new_errors
+    if not new_requests:
+        print("\nNew run made no requests: REGRESSION", file=out)
+        return True
+    errors_regressed = False
+    if base_requests:
+        base_rate, new_rate, error_p = two_proportion_test(base_errors, base_requests, new_errors, new_requests)
+        errors_regressed = new_rate > base_rate * (1 + threshold) and error_p < alpha
+        print(f"\nError rate {base_rate:.3%} -> {new_rate:.3%}, one-sided p = {error_p:.3g}: "
+              f"{'REGRESSION' if errors_regressed else 'ok'}", file=out)
+
+    if not base.count or not new.count:
+        empty = " and ".join(name for name, histogram in (("base", base), ("new", new)) if not histogram.count)
+        print(f"No successful samples in {empty}; latency not compared", file=out)
+        return errors_regressed
+
+    probability, shift_p = mann_whitney(base, new)
+    base_share, new_share, tail_p = tail_exceedance_test(base, new)
+    print(f"Mann-Whitney: P(new > base) = {probability:.3f}, one-sided p = {shift_p:.3g}", file=out)
+    print(f"Tail test: {new_share:.3%} of new samples above base p99 (base {base_share:.3%}), "
+          f"one-sided p = {tail_p:.3g}", file=out)
+
+    base_p99 = base.percentile(0.99)
+    p99_change = (new.percentile(0.99) - base_p99) / base_p99 if base_p99 else 0.0
+    latency_regressed = p99_change > threshold and tail_p < alpha
+    verdict = "REGRESSION" if latency_regressed else "ok"
+    print(f"p99 change {p99_change:+.1%} (threshold {threshold:.0%}, alpha {alpha}): {verdict}", file=out)
+    return latency_regressed or errors_regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and compare saved APIResponseTester runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print a saved run")
+    show.add_argument("path")
+    compare = commands.add_parser("compare", help="diff two runs; exits 1 on a significant p99 regression")
+    compare.add_argument("base")
+    compare.add_argument("new")
+    compare.add_argument("--threshold", type=float, default=0.10, help="allowed relative p99 increase")
+    compare.add_argument("--alpha", type=float, default=0.01, help="significance level of the tail test")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        document, histogram = load_result(args.path)
+        print(json.dumps(document, indent=2))
+        print("Recomputed from histogram:", histogram.summary())
+    else:
+        try:
+            regressed = compare_results(args.base, args.new, args.threshold, args.alpha)
+        except ValueError as error:
+            parser.exit(2, f"compare: {error}\n")
+        sys.exit(1 if regressed else 0)
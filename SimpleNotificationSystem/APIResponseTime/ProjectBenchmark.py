@@ -0,0 +1,265 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from itertools import cycle
+
+from ApiResponse import APIResponseTester
+from BenchmarkResults import save_result
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ("ParkingLot", "FileSystem", "StackOverflow", "CarRentalSystem", "AmazonLockerSystem",
+                  "ElevatorSystem", "SwitchableCache", "RateLimiter"):
+    sys.path.insert(0, os.path.join(ROOT, directory))
+
+import CarRentalSystem
+import Elevator
+import FileSystem
+import ParkingLot
+import Ratelimiter
+import StackOverflow
+import SwitchableCache
+import lockerSystem
+
+
+# Each setup function builds a system holding `n` items and returns the zero-argument hot-path
+# operation to time. Operations must leave the system as they found it so every call measures
+# the same state.
+
+# --- LLD modules ---
+def setup_parking_lot(n):
+    # Every spot but the last is taken, so park and unpark both walk the whole level. The car
+    # leaves through its level: ParkingLot.unpark_vehicle prints a cost from a ticket that
+    # vehicles do not carry.
+    ParkingLot.ParkingLot._instance = None
+    lot = ParkingLot.ParkingLot.get_instance()
+    level = ParkingLot.Level(1, n)
+    for spot in level.parking_spots[:-1]:
+        spot.park_vehicle(ParkingLot.Car(f"PARKED-{spot.spot_number}"))
+    lot.add_level(level)
+    car = ParkingLot.Car("BENCH-1")
+
+    def park_and_unpark():
+        lot.park_vehicle(car)
+        level.unpark_vehicle(car)
+    return park_and_unpark
+
+
+def setup_file_search(n):
+    # n files spread over directories of 100 files; the search visits all of them.
+    root = FileSystem.Directory("root")
+    for first in range(0, n, 100):
+        directory = FileSystem.Directory(f"dir{first // 100}")
+        for i in range(first, min(first + 100, n)):
+            extension = ("xml", "json", "txt", "bin")[i % 4]
+            directory.addEntry(FileSystem.File(f"file{i}.{extension}", i % 1000, ""))
+        root.addEntry(directory)
+    searcher = FileSystem.FileSearcher(FileSystem.AndFilter(FileSystem.ExtensionFilter("xml"),
+                                                            FileSystem.MinSizeFilter(500)))
+    return lambda: searcher.search(root)
+
+
+def _populate_stack_overflow(n):
+    system = StackOverflow.StackOverflow()
+    author = system.create_user("author", "author@example.com")
+    for i in range(n):
+        system.ask_question(author, f"question {i} about topic{i % 100}", "content", [f"tag{i % 50}"])
+    return system
+
+
+def setup_question_search(n):
+    system = _populate_stack_overflow(n)
+    return lambda: system.search_questions("topic7")
+
+
+def setup_question_vote(n):
+    # One question already carrying n votes; re-voting rebuilds the vote list.
+    system = StackOverflow.StackOverflow()
+    author = system.create_user("author", "author@example.com")
+    question = system.ask_question(author, "popular question", "content", ["python"])
+    # Filled directly: voting n times through the API would itself cost O(n^2).
+    question.votes = [StackOverflow.Vote(system.create_user(f"voter{i}", f"voter{i}@example.com"), 1)
+                      for i in range(n)]
+    voter = system.get_user(2)
+    return lambda: system.vote_question(voter, question, 1)
+
+
+def setup_car_reservation(n):
+    # n existing reservations on 100 cars; booking a car checks it against every reservation.
+    CarRentalSystem.RentalSystem._instance = None
+    system = CarRentalSystem.RentalSystem.get_instance()
+    cars = [CarRentalSystem.Car("Make", "Model", 2022, f"PLATE-{i}", 50, CarRentalSystem.VehicleType.CAR)
+            for i in range(100)]
+    for car in cars:
+        system.add_vehicle(car)
+    customer = CarRentalSystem.Customer("Bench", "bench@example.com", "0", "DL0")
+    first_day = date(2024, 1, 1)
+    for i in range(n):
+        start = first_day + timedelta(days=2 * (i // 100))
+        system.reservations[i] = CarRentalSystem.Reservation(i, customer, cars[i % 100], start,
+                                                             start + timedelta(days=1))
+    system.reservation_counter = n
+    free_start = first_day + timedelta(days=2 * (n // 100 + 1))
+    free_end = free_start + timedelta(days=1)
+
+    def reserve_and_cancel():
+        reservation = system.make_reservation(customer, cars[0], free_start, free_end)
+        system.cancel_reservation(reservation.reservation_id)
+    return reserve_and_cancel
+
+
+def setup_locker_assignment(n):
+    # n locations with three lockers each; assignment scans every location for the closest.
+    lockerSystem.AmazonLockerSystem._instance = None
+    locker_system = lockerSystem.AmazonLockerSystem(lockerSystem.EuclideanDistanceStrategy())
+    rng = random.Random(n)
+    for i in range(n):
+        lockers = [lockerSystem.Locker(3 * i + offset, size) for offset, size in enumerate(lockerSystem.PackageSize)]
+        locker_system.add_location(lockerSystem.Location(rng.uniform(-90, 90), rng.uniform(-180, 180), lockers))
+    customer = lockerSystem.Customer(1, 37.7749, -122.4194)
+
+    def assign_and_free():
+        locker_system.assign_locker(customer, lockerSystem.PackageSize.SMALL)
+        locker = customer.assigned_locker
+        locker.free()
+        locker.remove_observer(customer)
+        customer.assigned_locker = None
+    return assign_and_free
+
+
+def setup_elevator_dispatch(n):
+    controller = Elevator.ElevatorController(n, capacity=5, start_threads=False)
+    rng = random.Random(n)
+    for elevator in controller.elevators:
+        elevator.current_floor = rng.randint(1, 100)
+    return lambda: controller.find_optimal_elvator(50, 60)
+
+
+# --- Caches and limiters ---
+def _key_cycle(n):
+    rng = random.Random(n)
+    return cycle([rng.randrange(n) for _ in range(1024)])
+
+
+def setup_lru_cache(n):
+    cache = SwitchableCache.Cache(SwitchableCache.LRUTTLEvictionStrategy(max_size=n))
+    for key in range(n):
+        cache.put(key, key)
+    keys = _key_cycle(n)
+
+    def get_and_put():
+        key = next(keys)
+        cache.put(key, cache.get(key))
+    return get_and_put
+
+
+def setup_wtinylfu_cache(n):
+    cache = SwitchableCache.Cache(SwitchableCache.WTinyLFUEvictionStrategy(max_size=n))
+    for key in range(n):
+        cache.put(key, key)
+    keys = _key_cycle(2 * n)  # half the lookups miss and compete for admission
+
+    def get_or_load():
+        key = next(keys)
+        if cache.get(key) == -1:
+            cache.put(key, key)
+    return get_or_load
+
+
+def setup_keyed_rate_limiter(n):
+    limiter = Ratelimiter.KeyedRateLimiter(lambda: Ratelimiter.TokenBucketRateLimiter(capacity=10, refill_rate=10))
+    for key in range(n):
+        limiter.allow_request(key)
+    keys = _key_cycle(n)
+    return lambda: limiter.allow_request(next(keys))
+
+
+BENCHMARKS = {
+    "parking_lot.park_unpark": setup_parking_lot,
+    "file_system.search": setup_file_search,
+    "stack_overflow.search_questions": setup_question_search,
+    "stack_overflow.vote": setup_question_vote,
+    "car_rental.make_reservation": setup_car_reservation,
+    "locker.assign_locker": setup_locker_assignment,
+    "elevator.dispatch": setup_elevator_dispatch,
+    "cache.lru_get_put": setup_lru_cache,
+    "cache.wtinylfu_get_or_load": setup_wtinylfu_cache,
+    "rate_limiter.keyed_allow": setup_keyed_rate_limiter,
+}
+
+
+# --- Scaling curves ---
+def growth_exponent(sizes, latencies):
+    """
+    Least-squares slope of log(latency) against log(size): about 0 for O(1), 1 for O(n),
+    2 for O(n^2).
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(latency) for latency in latencies]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def describe_exponent(exponent):
+    if exponent < 0.2:
+        return "constant"
+    if exponent < 0.7:
+        return "sub-linear"
+    if exponent < 1.3:
+        return "linear"
+    return "super-linear"
+
+
+def run_benchmark(tester, name, setup, sizes, seconds, output):
+    """
+    Times `name` at every size, saves each point with save_result and returns its curve.
+    """
+    print(f"\n{name}")
+    print(f"{'n':>10}{'setup':>10}{'calls':>10}{'median':>12}{'p99':>12}")
+    curve = {"sizes": [], "median": [], "p99": [], "calls": []}
+    for size in sizes:
+        started = time.perf_counter()
+        operation = setup(size)
+        setup_seconds = time.perf_counter() - started
+        stats = tester.run_load_test(operation, duration=seconds, concurrency=1, warmup=3)
+        save_result(stats, os.path.join(output, f"{name}-n{size}"), benchmark=name, size=size)
+        curve["sizes"].append(size)
+        curve["median"].append(stats["median"])
+        curve["p99"].append(stats["p99"])
+        curve["calls"].append(stats["count"])
+        print(f"{size:>10}{setup_seconds:>9.2f}s{stats['count']:>10}"
+              f"{stats['median'] * 1e6:>10.1f}us{stats['p99'] * 1e6:>10.1f}us")
+    if len(sizes) > 1:
+        curve["exponent"] = growth_exponent(curve["sizes"], curve["median"])
+        print(f"  median ~ n^{curve['exponent']:.2f} ({describe_exponent(curve['exponent'])})")
+    return curve
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for the hot path of every module")
+    parser.add_argument("--min-exponent", type=int, default=3, help="smallest size is 10**min_exponent")
+    parser.add_argument("--max-exponent", type=int, default=5,
+                        help="largest size is 10**max_exponent (6 needs several GB for the object-heavy systems)")
+    parser.add_argument("--seconds", type=float, default=0.5, help="timed duration per size")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--output", default=os.path.join("benchmark-results", time.strftime("%Y%m%d-%H%M%S")),
+                        help="directory for per-point results and curves.json")
+    args = parser.parse_args()
+
+    sizes = [10 ** exponent for exponent in range(args.min_exponent, args.max_exponent + 1)]
+    os.makedirs(args.output, exist_ok=True)
+    tester = APIResponseTester()
+    curves = {}
+    for name in args.only or BENCHMARKS:
+        curves[name] = run_benchmark(tester, name, BENCHMARKS[name], sizes, args.seconds, args.output)
+
+    with open(os.path.join(args.output, "curves.json"), "w") as curves_file:
+        json.dump(curves, curves_file, indent=2)
+    print(f"\nResults written to {args.output} (compare points with BenchmarkResults.py compare)")
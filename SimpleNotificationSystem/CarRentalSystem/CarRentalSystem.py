@@ -71,7 +71,7 @@ class RentalSystem:
 
   def __init__(self):
     if RentalSystem._instance is not None:
-      raise ExceptioN("This class is singleton")
+      raise Exception("This class is singleton")
     else:
       RentalSystem._instance = self
       self.vehicles = {}
@@ -125,37 +125,39 @@ class RentalSystem:
       reservation.status = ReservationStatus.CANCELLED
   
   def pickup_reservation(self, reservation_id):
-    if reservation_id in self.reservations:
+    reservation = self.reservations.get(reservation_id)
+    if reservation is not None:
       reservation.status = ReservationStatus.IN_PROGRESS
   
   def process_payment(self, reservation, payment_processor: PaymentProcessor):
     return payment_processor.process_payment(reservation.total_price)
 
 
-rental_system = RentalSystem.get_instance()
+if __name__ == "__main__":
+  rental_system = RentalSystem.get_instance()
 
-rental_system.add_vehicle(Car("Toyota", "Camry", 2022, "ABC123", 50, VehicleType.CAR))
-rental_system.add_vehicle(Car("Honda", "Civic", 2022, "ABC867", 45, VehicleType.CAR))
-rental_system.add_vehicle(Car("FORD", "Mustang", 2022, "947321", 70, VehicleType.CAR))
+  rental_system.add_vehicle(Car("Toyota", "Camry", 2022, "ABC123", 50, VehicleType.CAR))
+  rental_system.add_vehicle(Car("Honda", "Civic", 2022, "ABC867", 45, VehicleType.CAR))
+  rental_system.add_vehicle(Car("FORD", "Mustang", 2022, "947321", 70, VehicleType.CAR))
 
-customer1 = Customer("John Doe", "john@example.com", "234234325", "DL1234")
-customer2 = Customer("Jane Smith", "jane@example.com", "23423453" ,"DL5678")
+  customer1 = Customer("John Doe", "john@example.com", "234234325", "DL1234")
+  customer2 = Customer("Jane Smith", "jane@example.com", "23423453" ,"DL5678")
 
-start_date = date.today()
-end_date = start_date + timedelta(days=3)
-available_cars = rental_system.search_cars("Honda", "Civic", start_date, end_date)
+  start_date = date.today()
+  end_date = start_date + timedelta(days=3)
+  available_cars = rental_system.search_cars("Honda", "Civic", start_date, end_date)
 
-if available_cars:
-  selected_car = available_cars[0]
-  reservation = rental_system.make_reservation(customer1, selected_car, start_date, end_date)
-  if reservation is not None:
-    payment_processor = PaypalPaymentProcessor()
-    payment_success = rental_system.process_payment(reservation, payment_processor)
-    if payment_success:
-      print(f"Reservation Success! ID: {reservation.reservation_id}")
+  if available_cars:
+    selected_car = available_cars[0]
+    reservation = rental_system.make_reservation(customer1, selected_car, start_date, end_date)
+    if reservation is not None:
+      payment_processor = PaypalPaymentProcessor()
+      payment_success = rental_system.process_payment(reservation, payment_processor)
+      if payment_success:
+        print(f"Reservation Success! ID: {reservation.reservation_id}")
+      else:
+        rental_system.cancel_reservation(reservation.reservation_id)
     else:
-      rental_system.cancel_reservation(reservation.reservation_id)
+      print("Selected car is not available for the given dates")
   else:
-    print("Selected car is not available for the given dates")
-else:
-  print("No available cars for the given dates")
+    print("No available cars for the given dates")
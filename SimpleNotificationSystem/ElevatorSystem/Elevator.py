@@ -61,12 +61,13 @@ class Elevator:
     self.process_requests()
 
 class ElevatorController:
-  def __init__(self, num_elevators, capacity):
+  def __init__(self, num_elevators, capacity, start_threads=True):
     self.elevators = []
     for i in range(num_elevators):
       elevator = Elevator(i + 1, capacity)
       self.elevators.append(elevator)
-      Thread(target=elevator.run).start()
+      if start_threads:
+        Thread(target=elevator.run).start()
   
   def request_elevator(self, source_floor, destination_floor):
     optimal_elevator = self.find_optimal_elvator(source_floor, destination_floor)
@@ -86,18 +87,19 @@ class ElevatorController:
 
 
 
-controller = ElevatorController(3, 5)
-time.sleep(3)
-controller.request_elevator(10, 12)
-time.sleep(3)
-controller.request_elevator(1, 7)
-time.sleep(3)
-controller.request_elevator(2, 5)
-time.sleep(3)
-controller.request_elevator(1, 9)
+if __name__ == "__main__":
+  controller = ElevatorController(3, 5)
+  time.sleep(3)
+  controller.request_elevator(10, 12)
+  time.sleep(3)
+  controller.request_elevator(1, 7)
+  time.sleep(3)
+  controller.request_elevator(2, 5)
+  time.sleep(3)
+  controller.request_elevator(1, 9)
 
-try:
-  while True:
-    time.sleep(1)
-except KeyboardInterrupt:
-  print("Elevator stopped.")
\ No newline at end of file
+  try:
+    while True:
+      time.sleep(1)
+  except KeyboardInterrupt:
+    print("Elevator stopped.")
@@ -122,41 +122,42 @@ class FileSearcher:
 
         return files
 
-# Test setup
-xml_file = File("aaa.xml", 5, "<hey!>")
-text_file = File("aaa.txt", 5, "aaaaa")
-json_file = File("aaa.json", 20, '"hey": {hey!}')
-large_file = File("large.bin", 500, "binary data")
-
-dir1 = Directory("dir1")
-dir1.addEntry(text_file)
-dir1.addEntry(xml_file)
-
-dir0 = Directory("dir0")
-dir0.addEntry(json_file)
-dir0.addEntry(large_file)
-dir0.addEntry(dir1)
-
-# Define OR filter for XML or JSON files
-or_filter = OrFilter(ExtensionFilter("xml"), ExtensionFilter("json"), MinSizeFilter(5))
-
-# Define AND filter for files with size >= 10 and name "large.bin"
-and_filter = AndFilter(MinSizeFilter(10), NameFilter("large.bin"))
-
-# Create a searcher using the OR filter (find XML or JSON files)
-searcher_or = FileSearcher(or_filter)
-files_or = searcher_or.search(dir0)
-
-# Print results for OR filter
-print("\nFiles matching OR filter (XML or JSON):")
-for file in files_or:
-    print(file)
-
-# Create a searcher using the AND filter (find large.bin if it's >= 10 bytes)
-searcher_and = FileSearcher(and_filter)
-files_and = searcher_and.search(dir0)
-
-# Print results for AND filter
-print("\nFiles matching AND filter (MinSize >= 10 and Name = 'large.bin'):")
-for file in files_and:
-    print(file)
+if __name__ == "__main__":
+    # Test setup
+    xml_file = File("aaa.xml", 5, "<hey!>")
+    text_file = File("aaa.txt", 5, "aaaaa")
+    json_file = File("aaa.json", 20, '"hey": {hey!}')
+    large_file = File("large.bin", 500, "binary data")
+
+    dir1 = Directory("dir1")
+    dir1.addEntry(text_file)
+    dir1.addEntry(xml_file)
+
+    dir0 = Directory("dir0")
+    dir0.addEntry(json_file)
+    dir0.addEntry(large_file)
+    dir0.addEntry(dir1)
+
+    # Define OR filter for XML or JSON files
+    or_filter = OrFilter(ExtensionFilter("xml"), ExtensionFilter("json"), MinSizeFilter(5))
+
+    # Define AND filter for files with size >= 10 and name "large.bin"
+    and_filter = AndFilter(MinSizeFilter(10), NameFilter("large.bin"))
+
+    # Create a searcher using the OR filter (find XML or JSON files)
+    searcher_or = FileSearcher(or_filter)
+    files_or = searcher_or.search(dir0)
+
+    # Print results for OR filter
+    print("\nFiles matching OR filter (XML or JSON):")
+    for file in files_or:
+        print(file)
+
+    # Create a searcher using the AND filter (find large.bin if it's >= 10 bytes)
+    searcher_and = FileSearcher(and_filter)
+    files_and = searcher_and.search(dir0)
+
+    # Print results for AND filter
+    print("\nFiles matching AND filter (MinSize >= 10 and Name = 'large.bin'):")
+    for file in files_and:
+        print(file)
@@ -0,0 +1,88 @@
+import sys
+import time
+
+from NotificationDispatcher import BatchingNotifier, FakeChannelSink, NotificationDispatcher
+from StockNotification import EmailNotificationObserver, IphoneObervableImpl, PhoneNotificationObserver
+
+
+def build_observable(num_subscribers, dispatcher, email_sink, sms_sink):
+    # Nine in ten subscribers want email, the rest SMS.
+    observable = IphoneObervableImpl(dispatcher)
+    for i in range(num_subscribers):
+        if i % 10:
+            observable.add(EmailNotificationObserver(f"user{i}@example.com", observable, email_sink))
+        else:
+            observable.add(PhoneNotificationObserver(f"555-{i:07d}", observable, sms_sink))
+    return observable
+
+
+# --- Producer blocking time and end-to-end delivery ---
+def bench_fan_out(num_subscribers, dispatcher, email_sink, sms_sink, batcher = None):
+    """
+    Returns (seconds setStockCount blocked the caller, seconds until every subscriber was
+    notified, total messages sent). With a batcher, notify() goes through it and its
+    remaining batches are flushed before waiting for the dispatcher.
+    """
+    observable = build_observable(num_subscribers, batcher or dispatcher, email_sink, sms_sink)
+    started = time.perf_counter()
+    observable.setStockCount(5)
+    returned = time.perf_counter() - started
+    if batcher is not None:
+        batcher.close()
+    if dispatcher is not None:
+        dispatcher.join()
+    finished = time.perf_counter() - started
+    return returned, finished, email_sink.sent + sms_sink.sent
+
+
+def report(name, returned, finished, sent, dispatcher = None):
+    print(f"  {name:<14}: caller blocked {returned:6.2f}s, delivered {sent:,} in {finished:6.2f}s")
+    if dispatcher is not None:
+        for channel, summary in dispatcher.stats().items():
+            print(f"    {channel}: {summary}")
+        dispatcher.close()
+
+
+if __name__ == "__main__":
+    num_subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Fan-out to {num_subscribers:,} subscribers through instant fake sinks (dispatch overhead)")
+    report("serial notify", *bench_fan_out(num_subscribers, None, FakeChannelSink(), FakeChannelSink()))
+    dispatcher = NotificationDispatcher(workers_per_channel=4)
+    report("dispatcher", *bench_fan_out(num_subscribers, dispatcher, FakeChannelSink(), FakeChannelSink()),
+           dispatcher)
+
+    slow_subscribers = 2_000
+    print(f"\nFan-out to {slow_subscribers:,} subscribers; email takes 1ms, SMS 20ms and fails 5% of the time")
+    # The serial path has no retries, so its SMS sink does not fail.
+    report("serial notify", *bench_fan_out(slow_subscribers, None, FakeChannelSink(latency=0.001),
+                                           FakeChannelSink(latency=0.02)))
+    dispatcher = NotificationDispatcher(workers_per_channel=32, backoff=0.01)
+    report("dispatcher", *bench_fan_out(slow_subscribers, dispatcher, FakeChannelSink(latency=0.001),
+                                        FakeChannelSink(latency=0.02, failure_rate=0.05, seed=1)), dispatcher)
+
+    batch_subscribers = 100_000
+    print(f"\nFan-out to {batch_subscribers:,} subscribers; each provider request takes 1ms for email, 5ms for SMS")
+    for name, batch_size in (("one per message", None), ("bulk of 500", 500)):
+        email_sink, sms_sink = FakeChannelSink(latency=0.001), FakeChannelSink(latency=0.005)
+        dispatcher = NotificationDispatcher(workers_per_channel=16)
+        batcher = BatchingNotifier(dispatcher, batch_size=batch_size) if batch_size else None
+        returned, finished, sent = bench_fan_out(batch_subscribers, dispatcher, email_sink, sms_sink, batcher)
+        report(name, returned, finished, sent)
+        print(f"    {sent / finished:,.0f} messages/s over {email_sink.requests + sms_sink.requests:,} provider requests")
+        dispatcher.close()
+
+    print(f"\nSubscription registry with {batch_subscribers:,} subscribers")
+    observable = build_observable(batch_subscribers, None, FakeChannelSink(), FakeChannelSink())
+    started = time.perf_counter()
+    observable.setStockCount(5)  # restock: every subscriber matches
+    restock = time.perf_counter() - started
+    started = time.perf_counter()
+    observable.setStockCount(5)  # no subscriber's predicate matches
+    filtered = time.perf_counter() - started
+    leaving = observable.registry.subscribers(observable.topic)[::2]
+    started = time.perf_counter()
+    for observer in leaving:
+        observable.remove(observer)
+    unsubscribe = (time.perf_counter() - started) / len(leaving)
+    print(f"  restock notify {restock * 1e3:.1f}ms, filtered-out notify {filtered * 1e6:.1f}us, "
+          f"unsubscribe {unsubscribe * 1e9:,.0f}ns each ({len(observable.registry):,} left)")
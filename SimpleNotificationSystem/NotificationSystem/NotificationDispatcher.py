@@ -0,0 +1,386 @@
+import random
+import time
+from queue import Full, Queue
+from threading import Event, Lock, Thread
+
+from StockNotification import EmailNotificationObserver, IphoneObervableImpl, PhoneNotificationObserver
+
+
+class DeliveryError(Exception):
+    pass
+
+
+class FakeChannelSink:
+    """
+    Stand-in for an email or SMS provider. Every request (send() or send_bulk()) takes
+    `latency` seconds and fails with probability failure_rate; otherwise its messages are
+    counted instead of sent.
+    """
+
+    def __init__(self, latency = 0.0, failure_rate = 0.0, seed = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.sent = 0
+        self.requests = 0
+        self.lock = Lock()
+
+    def send(self, address, message):
+        self.send_bulk([(address, message)])
+
+    def send_bulk(self, messages):
+        """
+        Sends a list of (address, message) pairs as one provider request.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            raise DeliveryError(f"provider rejected a request of {len(messages)} messages")
+        with self.lock:
+            self.sent += len(messages)
+            self.requests += 1
+
+
+class DeliveryStats:
+    """
+    Delivery counters and a latency histogram for one worker; merge() aggregates them. Latency
+    buckets are log-linear with 8 sub-buckets per power of two, so a reported percentile is
+    the upper edge of a bucket at most 12.5% wider than the values in it.
+    """
+
+    SUB_BUCKET_BITS = 3
+
+    def __init__(self):
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.latency_counts = [0] * ((64 << self.SUB_BUCKET_BITS) + 1)
+        self.max_latency_ns = 0
+
+    def record(self, latency_ns):
+        self.delivered += 1
+        shift = max(0, latency_ns.bit_length() - self.SUB_BUCKET_BITS - 1)
+        self.latency_counts[(shift << self.SUB_BUCKET_BITS) + (latency_ns >> shift)] += 1
+        if latency_ns > self.max_latency_ns:
+            self.max_latency_ns = latency_ns
+
+    def merge(self, other):
+        self.delivered += other.delivered
+        self.failed += other.failed
+        self.retried += other.retried
+        for index, count in enumerate(other.latency_counts):
+            self.latency_counts[index] += count
+        self.max_latency_ns = max(self.max_latency_ns, other.max_latency_ns)
+
+    def percentile(self, fraction):
+        """
+        Latency in nanoseconds below which `fraction` of deliveries completed.
+        """
+        if not self.delivered:
+            return None
+        target = fraction * self.delivered
+        seen = 0
+        for index, count in enumerate(self.latency_counts):
+            seen += count
+            if count and seen >= target:
+                shift = max(0, (index >> self.SUB_BUCKET_BITS) - 1)
+                upper_edge = (((index - (shift << self.SUB_BUCKET_BITS)) + 1) << shift) - 1
+                return min(upper_edge, self.max_latency_ns)
+        return self.max_latency_ns
+
+    def summary(self):
+        summary = {"delivered": self.delivered, "failed": self.failed, "retried": self.retried}
+        for name, fraction in (("p50_ms", 0.5), ("p90_ms", 0.9), ("p99_ms", 0.99)):
+            latency = self.percentile(fraction)
+            summary[name] = latency / 1e6 if latency is not None else None
+        summary["max_ms"] = self.max_latency_ns / 1e6
+        return summary
+
+
+class _ChannelPool:
+    def __init__(self, name, num_workers, queue_size):
+        self.name = name
+        self.queue = Queue(maxsize=queue_size)
+        self.worker_stats = [DeliveryStats() for _ in range(num_workers)]
+        self.dropped = 0
+        self.workers = []
+
+
+class NotificationDispatcher:
+    """
+    Fans notifications out to a pool of worker threads per channel (observer.channel), so a
+    slow or failing channel only delays its own deliveries and never the thread that called
+    notify().
+
+    dispatch() groups observers by channel, splits each group into chunks of at most
+    chunk_size and puts them on that channel's bounded queue. When the queue is full,
+    overflow="block" makes the producer wait (backpressure) and overflow="drop" discards the
+    chunk and counts its observers in `dropped`. Workers call observer.deliver(stock) and retry a failed delivery up to
+    max_retries times, sleeping backoff * 2**attempt (with jitter) in between. The latency
+    recorded per delivery runs from dispatch() to success.
+    """
+
+    OVERFLOW_POLICIES = ("block", "drop")
+
+    def __init__(self, workers_per_channel = 4, queue_size = 1024, chunk_size = 256, max_retries = 3,
+                 backoff = 0.05, overflow = "block"):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {self.OVERFLOW_POLICIES}")
+        self.workers_per_channel = workers_per_channel
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.overflow = overflow
+        self.pools = {}
+        self.lock = Lock()  # guards pool creation and drop counters
+        self._closed = False
+
+    def _pool(self, channel):
+        pool = self.pools.get(channel)
+        if pool is None:
+            with self.lock:
+                pool = self.pools.get(channel)
+                if pool is None:
+                    pool = _ChannelPool(channel, self.workers_per_channel, self.queue_size)
+                    for stats in pool.worker_stats:
+                        worker = Thread(target=self._work, args=(pool.queue, stats), daemon=True)
+                        worker.start()
+                        pool.workers.append(worker)
+                    self.pools[channel] = pool
+        return pool
+
+    def dispatch(self, observers, stock):
+        enqueued_at = time.perf_counter_ns()
+        by_channel = {}
+        for observer in observers:
+            channel_observers = by_channel.get(observer.channel)
+            if channel_observers is None:
+                channel_observers = by_channel[observer.channel] = []
+            channel_observers.append(observer)
+        for channel, channel_observers in by_channel.items():
+            self.submit(channel, channel_observers, stock, enqueued_at)
+
+    def submit(self, channel, observers, stock, enqueued_at = None):
+        """
+        Queues deliveries to observers that all belong to `channel`, for callers that already
+        keep observers per channel. Small audiences are split so every worker gets a share.
+        """
+        if self._closed:
+            raise ValueError("dispatch on a closed NotificationDispatcher")
+        if enqueued_at is None:
+            enqueued_at = time.perf_counter_ns()
+        size = max(1, min(self.chunk_size, -(-len(observers) // self.workers_per_channel)))
+        chunks = [observers[start:start + size] for start in range(0, len(observers), size)]
+        pool = self._pool(channel)
+        for chunk in chunks:
+            item = (chunk, stock, enqueued_at)
+            if self.overflow == "block":
+                pool.queue.put(item)
+                continue
+            try:
+                pool.queue.put_nowait(item)
+            except Full:
+                with self.lock:
+                    pool.dropped += len(chunk)
+
+    def _work(self, queue, stats):
+        while True:
+            item = queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            chunk, stock, enqueued_at = item
+            for observer in chunk:
+                self._deliver(observer, stock, enqueued_at, stats)
+            queue.task_done()
+
+    def _deliver(self, observer, stock, enqueued_at, stats):
+        for attempt in range(self.max_retries + 1):
+            try:
+                observer.deliver(stock)
+            except Exception:
+                if attempt == self.max_retries:
+                    stats.failed += 1
+                    return
+                stats.retried += 1
+                time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+            else:
+                stats.record(time.perf_counter_ns() - enqueued_at)
+                return
+
+    def join(self):
+        """
+        Blocks until every queued notification has been delivered or has failed.
+        """
+        for pool in list(self.pools.values()):
+            pool.queue.join()
+
+    def stats(self):
+        """
+        Per-channel DeliveryStats summaries plus the number of dropped deliveries.
+        """
+        report = {}
+        for channel, pool in list(self.pools.items()):
+            merged = DeliveryStats()
+            for stats in pool.worker_stats:
+                merged.merge(stats)
+            report[channel] = merged.summary()
+            report[channel]["dropped"] = pool.dropped
+        return report
+
+    def close(self):
+        """
+        Delivers what is already queued, then stops the workers.
+        """
+        self._closed = True
+        for pool in list(self.pools.values()):
+            for _ in pool.workers:
+                pool.queue.put(None)
+            for worker in pool.workers:
+                worker.join()
+
+
+class _BulkSend:
+    # One provider request for a batch; NotificationDispatcher delivers it like an observer.
+    def __init__(self, channel, transport, messages):
+        self.channel = channel
+        self.transport = transport
+        self.messages = messages
+
+    def deliver(self, stock):
+        send_bulk = getattr(self.transport, "send_bulk", None)
+        if send_bulk is not None:
+            send_bulk(self.messages)
+        else:
+            for address, message in self.messages:
+                self.transport.send(address, message)
+
+
+class BatchingNotifier:
+    """
+    Sits between an observable and its observers and coalesces notifications into bulk sends.
+    Messages for observers with a transport are buffered per (channel, transport) and sent as
+    one send_bulk request once batch_size are waiting or the oldest has waited max_delay
+    seconds. Observers without a transport are passed through unbatched.
+
+    Batches go to `dispatcher` (a NotificationDispatcher) when given, so they get its queues,
+    retries and latency stats, and are sent on the calling thread otherwise. close() stops the
+    timer and sends whatever is still buffered.
+
+    A batch that cannot be sent or handed to the dispatcher (a transport error on the calling
+    thread, a closed dispatcher) is counted in failed_batches and failed_messages, with the
+    exception kept in last_error; it is not retried, and the timer keeps running.
+    """
+
+    def __init__(self, dispatcher = None, batch_size = 500, max_delay = 0.1):
+        self.dispatcher = dispatcher
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.buffers = {}  # (channel, transport) -> [first buffered at, [(address, message), ...]]
+        self.failed_batches = 0
+        self.failed_messages = 0
+        self.last_error = None
+        self.lock = Lock()
+        self._closed = Event()
+        self._flusher = Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def dispatch(self, observers, stock):
+        full = []
+        unbatched = []
+        now = time.monotonic()
+        with self.lock:
+            buffers = self.buffers
+            batch_size = self.batch_size
+            for observer in observers:
+                transport = observer.transport
+                if transport is None:
+                    unbatched.append(observer)
+                    continue
+                key = (observer.channel, transport)
+                buffer = buffers.get(key)
+                if buffer is None:
+                    buffer = buffers[key] = [now, []]
+                messages = buffer[1]
+                messages.append(observer.compose(stock))
+                if len(messages) == batch_size:
+                    full.append(_BulkSend(observer.channel, transport, messages))
+                    del buffers[key]
+        self._send(full, stock)
+        if unbatched:
+            if self.dispatcher is not None:
+                self.dispatcher.dispatch(unbatched, stock)
+            else:
+                for observer in unbatched:
+                    observer.deliver(stock)
+
+    def _send(self, batches, stock):
+        if self.dispatcher is not None:
+            by_channel = {}
+            for batch in batches:
+                by_channel.setdefault(batch.channel, []).append(batch)
+            for channel, channel_batches in by_channel.items():
+                try:
+                    self.dispatcher.submit(channel, channel_batches, stock)
+                except Exception as error:
+                    self._failed(channel_batches, error)
+        else:
+            for batch in batches:
+                try:
+                    batch.deliver(stock)
+                except Exception as error:
+                    self._failed([batch], error)
+
+    def _failed(self, batches, error):
+        with self.lock:
+            self.failed_batches += len(batches)
+            self.failed_messages += sum(len(batch.messages) for batch in batches)
+            self.last_error = error
+
+    def flush(self, older_than = None):
+        """
+        Sends every buffered batch, or only those whose oldest message is older than
+        `older_than` seconds.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if older_than is None:
+                due = list(self.buffers.items())
+                self.buffers = {}
+            else:
+                due = [(key, buffer) for key, buffer in self.buffers.items() if now - buffer[0] >= older_than]
+                for key, _ in due:
+                    del self.buffers[key]
+        # The stock argument is unused: each message was composed when it was buffered.
+        self._send([_BulkSend(channel, transport, buffer[1]) for (channel, transport), buffer in due], None)
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.max_delay / 2):
+            self.flush(older_than=self.max_delay)
+
+    def close(self):
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+
+
+if __name__ == "__main__":
+    email_sink = FakeChannelSink(latency=0.001, failure_rate=0.05, seed=1)
+    sms_sink = FakeChannelSink(latency=0.05, seed=2)  # a slow provider
+    dispatcher = NotificationDispatcher(workers_per_channel=8, backoff=0.01)
+    iphone_observable = IphoneObervableImpl(dispatcher)
+    for i in range(2_000):
+        iphone_observable.add(EmailNotificationObserver(f"user{i}@example.com", iphone_observable, email_sink))
+    for i in range(50):
+        iphone_observable.add(PhoneNotificationObserver(f"555-{i:04d}", iphone_observable, sms_sink))
+
+    started = time.perf_counter()
+    iphone_observable.setStockCount(5)
+    print(f"setStockCount returned after {(time.perf_counter() - started) * 1e3:.1f}ms "
+          f"for {len(iphone_observable.registry)} observers")
+    dispatcher.join()
+    print(f"All delivered after {(time.perf_counter() - started) * 1e3:.1f}ms")
+    for channel, summary in dispatcher.stats().items():
+        print(f"  {channel}: {summary}")
+    dispatcher.close()
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 
+from SubscriptionRegistry import SubscriptionRegistry, back_in_stock, out_of_stock
+
 class StocksObservable(ABC):
     @abstractmethod
-    def add(self, observer: NotificationAlertObserver):
+    def add(self, observer: "NotificationAlertObserver"):
         pass
     @abstractmethod
-    def remove(self, observer: NotificationAlertObserver):
+    def remove(self, observer: "NotificationAlertObserver"):
         pass
     @abstractmethod
     def notify(self):
@@ -18,67 +20,125 @@ class StocksObservable(ABC):
         pass
 
 class NotificationAlertObserver(ABC):
+    channel = "default"  # observers sharing a channel share its dispatcher workers
+    transport = None  # provider client with send(address, message), optionally send_bulk(messages)
+
     @abstractmethod
     def update(self):
         pass
 
+    def deliver(self, stock):
+        # Sends the notification for a stock count captured at notify() time; used by
+        # NotificationDispatcher, which delivers after the count may have moved on.
+        self.update()
+
 class EmailNotificationObserver(NotificationAlertObserver):
-    def __init__(self, email: str, observable: StocksObservable):
+    channel = "email"
+
+    def __init__(self, email: str, observable: StocksObservable, transport = None):
         self.email = email
         self.observable  = observable
+        self.transport = transport
 
     def update(self):
         self.sendEmail(self.observable.getStockCount())
 
+    def deliver(self, stock):
+        self.sendEmail(stock)
+
+    def compose(self, stock):
+        return self.email, f"Current Stock: {stock}"
+
     def sendEmail(self, stock):
-        print(f"Sending email to {self.email}. Current Stock: {stock}")
+        if self.transport is not None:
+            self.transport.send(*self.compose(stock))
+        else:
+            print(f"Sending email to {self.email}. Current Stock: {stock}")
 
 class PhoneNotificationObserver(NotificationAlertObserver):
-    
-    def __init__(self, phoneNumber: str, observable: StocksObservable):
+    channel = "sms"
+
+    def __init__(self, phoneNumber: str, observable: StocksObservable, transport = None):
         self.phone = phoneNumber
         self.observable  = observable
+        self.transport = transport
 
     def update(self):
         self.sendSMS(self.observable.getStockCount())
 
+    def deliver(self, stock):
+        self.sendSMS(stock)
+
+    def compose(self, stock):
+        return self.phone, f"Current Stock: {stock}"
+
     def sendSMS(self, stock):
-        print(f"Sending SMS to {self.phone}. Current Stock: {stock}")
+        if self.transport is not None:
+            self.transport.send(*self.compose(stock))
+        else:
+            print(f"Sending SMS to {self.phone}. Current Stock: {stock}")
 
 class IphoneObervableImpl(StocksObservable):
-    def __init__(self):
-        self.notificationObservers = []
+    def __init__(self, dispatcher = None, registry = None, topic = "iphone"):
+        """
+        :param dispatcher: Optional NotificationDispatcher or BatchingNotifier; when set,
+                           notify() hands it the observers and returns instead of calling
+                           every observer in turn.
+        :param registry: SubscriptionRegistry to keep subscribers in, so several products
+                         can share one; a private one is created by default.
+        :param topic: Key of this product's subscribers in the registry.
+        """
+        self.registry = registry if registry is not None else SubscriptionRegistry()
+        self.topic = topic
         self.stock = 0
+        self.previousStock = 0
+        self.dispatcher = dispatcher
 
-    def add(self, observer: NotificationAlertObserver):
-        self.notificationObservers.append(observer)
+    def add(self, observer: NotificationAlertObserver, predicate = back_in_stock):
+        """
+        :param predicate: predicate(previous, current) choosing which stock changes reach
+                          the observer; by default only restocks from zero.
+        """
+        self.registry.add(self.topic, observer, predicate)
+
+    def remove(self, observer: NotificationAlertObserver):
+        self.registry.remove(self.topic, observer)
 
-    def remove(self):
-        self.notificationObservers.remove(observer)
-    
     def notify(self):
-        for observer in self.notificationObservers:
+        observers = self.registry.matching(self.topic, self.previousStock, self.stock)
+        if not observers:
+            return
+        if self.dispatcher is not None:
+            self.dispatcher.dispatch(observers, self.stock)
+            return
+        for observer in observers:
             observer.update()
     
     def setStockCount(self, newStock: int):
-        if self.stock == 0:
-            self.stock += newStock
-            self.notify()
-        else:
-            self.stock += newStock
+        self.previousStock = self.stock
+        self.stock += newStock
+        self.notify()
 
     def getStockCount(self):
         return self.stock
 
-iphone_observable = IphoneObervableImpl()
+if __name__ == "__main__":
+    iphone_observable = IphoneObervableImpl()
+
+    email_notification1 = EmailNotificationObserver("gaurangjotwani@gmail.com", iphone_observable)
+    email_notification2 = EmailNotificationObserver("xyz@gmail.com", iphone_observable)
+    phone_notification1 = PhoneNotificationObserver("2176488657", iphone_observable)
 
-email_notification1 = EmailNotificationObserver("gaurangjotwani@gmail.com", iphone_observable)
-email_notification2 = EmailNotificationObserver("xyz@gmail.com", iphone_observable)
-phone_notification1 = PhoneNotificationObserver("2176488657", iphone_observable)
+    iphone_observable.add(email_notification1)
+    iphone_observable.add(email_notification2)
+    iphone_observable.add(phone_notification1)
 
-iphone_observable.add(email_notification1)
-iphone_observable.add(email_notification2)
-iphone_observable.add(phone_notification1)
+    iphone_observable.setStockCount(5)
+    iphone_observable.setStockCount(10)
 
-iphone_observable.setStockCount(5)
-iphone_observable.setStockCount(10)
\ No newline at end of file
+    # Everyone else only hears about restocks; this subscriber also wants sell-outs.
+    iphone_observable.add(EmailNotificationObserver("watcher@example.com", iphone_observable),
+                          lambda previous, current: back_in_stock(previous, current) or out_of_stock(previous, current))
+    iphone_observable.remove(email_notification2)
+    iphone_observable.setStockCount(-15)
+    iphone_observable.setStockCount(3)
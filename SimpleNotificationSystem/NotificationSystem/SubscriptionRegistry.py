@@ -0,0 +1,109 @@
+from itertools import chain
+from threading import Lock
+
+
+# --- Predicates ---
+# A predicate takes (previous stock, current stock) and says whether a subscriber cares.
+def always(previous, current):
+    return True
+
+
+def back_in_stock(previous, current):
+    return previous == 0 and current > 0
+
+
+def out_of_stock(previous, current):
+    return previous > 0 and current == 0
+
+
+class SubscriptionRegistry:
+    """
+    Subscribers indexed by topic (a product), then by (channel, predicate).
+
+    add() and remove() are O(1): each subscriber sits in an insertion-ordered dict for its
+    bucket, and a membership index finds the bucket on removal. matching() evaluates each
+    distinct predicate once per event rather than once per subscriber, so subscribers sharing
+    a predicate such as back_in_stock cost nothing when it is false.
+
+    Reads use copy-on-write snapshots: a topic's buckets are copied into immutable tuples on
+    the first read after a change and reused until the next change, so a notification in
+    flight keeps iterating its snapshot while other threads subscribe and unsubscribe.
+    """
+
+    def __init__(self):
+        self.topics = {}  # topic -> {(channel, predicate): {observer: None}}
+        self.membership = {}  # (topic, observer) -> (channel, predicate)
+        self.snapshots = {}  # topic -> ((channel, predicate, (observer, ...)), ...)
+        self.lock = Lock()
+
+    def add(self, topic, observer, predicate = always):
+        """
+        Subscribes observer to topic on its channel; re-adding moves it to the new predicate.
+        """
+        with self.lock:
+            key = self.membership.get((topic, observer))
+            if key is not None:
+                self._discard(topic, observer, key)
+            key = (observer.channel, predicate)
+            self.topics.setdefault(topic, {}).setdefault(key, {})[observer] = None
+            self.membership[(topic, observer)] = key
+            self.snapshots.pop(topic, None)
+
+    def remove(self, topic, observer):
+        """
+        Unsubscribes observer from topic; raises KeyError if it was not subscribed.
+        """
+        with self.lock:
+            key = self.membership.pop((topic, observer))
+            self._discard(topic, observer, key)
+            self.snapshots.pop(topic, None)
+
+    def _discard(self, topic, observer, key):
+        # Caller holds self.lock.
+        buckets = self.topics[topic]
+        bucket = buckets[key]
+        del bucket[observer]
+        if not bucket:
+            del buckets[key]
+            if not buckets:
+                del self.topics[topic]
+
+    def snapshot(self, topic):
+        """
+        Returns the topic's buckets as an immutable tuple of (channel, predicate, observers).
+        """
+        snapshot = self.snapshots.get(topic)
+        if snapshot is None:
+            with self.lock:
+                snapshot = self.snapshots.get(topic)
+                if snapshot is None:
+                    snapshot = tuple((channel, predicate, tuple(bucket))
+                                     for (channel, predicate), bucket in self.topics.get(topic, {}).items())
+                    self.snapshots[topic] = snapshot
+        return snapshot
+
+    def matching(self, topic, previous, current, channel = None):
+        """
+        Returns the observers of topic (optionally only one channel) whose predicate accepts the
+        change from previous to current. Each distinct predicate is called once.
+        """
+        verdicts = {}
+        selected = []
+        for bucket_channel, predicate, observers in self.snapshot(topic):
+            if channel is not None and bucket_channel != channel:
+                continue
+            verdict = verdicts.get(predicate)
+            if verdict is None:
+                verdict = verdicts[predicate] = bool(predicate(previous, current))
+            if verdict:
+                selected.append(observers)
+        return list(chain.from_iterable(selected))
+
+    def subscribers(self, topic):
+        return [observer for _, _, observers in self.snapshot(topic) for observer in observers]
+
+    def __contains__(self, topic_and_observer):
+        return topic_and_observer in self.membership
+
+    def __len__(self):
+        return len(self.membership)
@@ -1,6 +1,7 @@
 from abc import ABC
 from enum import Enum
 from datetime import datetime
+from typing import List
 import time
 
 class VehicleType(Enum):
@@ -18,7 +19,7 @@ class Vehicle(ABC):
 
 class Car(Vehicle):
     def __init__(self, license_plate: str):
-        super().__init__(licence_plate, VehicleType.CAR)
+        super().__init__(license_plate, VehicleType.CAR)
 
 class Motorcycle(Vehicle):
     def __init__(self, license_plate: str):
@@ -29,11 +30,20 @@ class Truck(Vehicle):
     super().__init__(licence_plate, VehicleType.TRUCK)
 
 class ParkingSpot:
-    def __init__(self, spot_number: int):
+    def __init__(self, spot_number: int, vehicle_type: VehicleType = VehicleType.CAR):
         self.spot_number = spot_number
-        self.vehicle_type = VehicleType.CAR  # Default vehicle type is CAR
+        self.vehicle_type = vehicle_type
         self.parked_vehicle = None
 
+    def get_spot_number(self) -> int:
+        return self.spot_number
+
+    def get_vehicle_type(self) -> VehicleType:
+        return self.vehicle_type
+
+    def get_parked_vehicle(self) -> Vehicle:
+        return self.parked_vehicle
+
     def is_available(self) -> bool:
         return self.parked_vehicle is None
 
@@ -51,6 +61,9 @@ class Level:
         self.floor = floor
         self.parking_spots: List[ParkingSpot] = [ParkingSpot(i) for i in range(num_spots)]
 
+    def add_spot(self, spot: ParkingSpot) -> None:
+        self.parking_spots.append(spot)
+
     def park_vehicle(self, vehicle: Vehicle) -> bool:
         for spot in self.parking_spots:
             if spot.is_available() and spot.get_vehicle_type() == vehicle.get_type():
@@ -81,8 +94,9 @@ class ParkingLot:
     if ParkingLot._instance is not None:
       raise ValueError("This is a singleton class which has already been initialized")
     ParkingLot._instance = self
-    self.level = []  
+    self.levels = []
   
+  @staticmethod
   def get_instance():
     if ParkingLot._instance is None:
       ParkingLot()
@@ -111,27 +125,26 @@ class ParkingLot:
   
 
 
-parking_lot = ParkingLot.get_instance()
-level3 = Level(1, 10)
-level3.add_spot(ParkingSpot(10, VehicleType.BIKE))
-parking_lot.add_level(Level(1, 10))
-parking_lot.add_level(Level(2, 20))
-parking_lot.add_level(level3)
-
-car = Car("ABC123")
-truck = Car("XYZ789")
-bike = Bike("1235HH")
+if __name__ == "__main__":
+  parking_lot = ParkingLot.get_instance()
+  level3 = Level(1, 10)
+  level3.add_spot(ParkingSpot(10, VehicleType.BIKE))
+  parking_lot.add_level(Level(1, 10))
+  parking_lot.add_level(Level(2, 20))
+  parking_lot.add_level(level3)
 
-parking_lot.park_vehicle(car)
-parking_lot.park_vehicle(truck)
-parking_lot.park_vehicle(bike)
+  car = Car("ABC123")
+  truck = Car("XYZ789")
+  bike = Bike("1235HH")
 
-parking_lot.display_availability()
+  parking_lot.park_vehicle(car)
+  parking_lot.park_vehicle(truck)
+  parking_lot.park_vehicle(bike)
 
-time.sleep(20)
+  parking_lot.display_availability()
 
-parking_lot.unpark_vehicle(car)
+  time.sleep(20)
 
-parking_lot.display_availability()
+  parking_lot.unpark_vehicle(car)
 
-      
+  parking_lot.display_availability()
@@ -0,0 +1,222 @@
+import asyncio
+import sys
+import time
+import tracemalloc
+from multiprocessing import Process, Queue
+from threading import Thread
+
+from Ratelimiter import (
+    AsyncTokenBucketRateLimiter,
+    CompositeRateLimiter,
+    KeyedRateLimiter,
+    LeakyBucketRateLimiter,
+    SharedTokenBucketTable,
+    SlidingWindowCounterRateLimiter,
+    SlidingWindowLogRateLimiter,
+    TokenBucketRateLimiter,
+    TokenBucketTable,
+    np,
+)
+
+
+# --- KeyedRateLimiter throughput ---
+def bench_keyed_throughput(num_threads: int, num_keys: int, requests_per_thread: int) -> float:
+    """
+    Drives one KeyedRateLimiter from num_threads threads, spreading requests over num_keys
+    distinct keys, and returns the aggregate allow_request calls per second.
+    """
+    limiter = KeyedRateLimiter(lambda: TokenBucketRateLimiter(capacity=10, refill_rate=5))
+
+    def worker(offset):
+        allow = limiter.allow_request
+        for i in range(requests_per_thread):
+            allow((offset + i * 7919) % num_keys)
+
+    threads = [Thread(target=worker, args=(t * requests_per_thread,)) for t in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return num_threads * requests_per_thread / elapsed
+
+
+# --- Batch admission vs per-request admission ---
+def bench_batch_admission(num_requests: int, batch_size: int):
+    """
+    Returns requests/sec for per-request allow_request, allow_many batches and, when numpy is
+    available, a vectorised TokenBucketTable over 1000 keys.
+    """
+    results = {}
+
+    bucket = TokenBucketRateLimiter(capacity=num_requests, refill_rate=0)
+    start = time.perf_counter()
+    for _ in range(num_requests):
+        bucket.allow_request()
+    results["allow_request"] = num_requests / (time.perf_counter() - start)
+
+    bucket = TokenBucketRateLimiter(capacity=num_requests, refill_rate=0)
+    start = time.perf_counter()
+    for _ in range(num_requests // batch_size):
+        bucket.allow_many(batch_size)
+    results["allow_many"] = num_requests / (time.perf_counter() - start)
+
+    if np is not None:
+        table = TokenBucketTable(size=1000, capacity=num_requests, refill_rate=0)
+        keys = np.arange(num_requests) % 1000
+        start = time.perf_counter()
+        for offset in range(0, num_requests, batch_size):
+            table.acquire_batch(keys[offset:offset + batch_size])
+        results["acquire_batch"] = num_requests / (time.perf_counter() - start)
+    return results
+
+
+# --- Memory per key and decision latency per limiter class ---
+LIMITER_FACTORIES = {
+    "TokenBucket": lambda limit: TokenBucketRateLimiter(capacity=limit, refill_rate=limit),
+    "LeakyBucket": lambda limit: LeakyBucketRateLimiter(capacity=limit, leak_rate=limit),
+    "SlidingWindowLog": lambda limit: SlidingWindowLogRateLimiter(max_requests=limit, window=1),
+    "SlidingWindowCounter": lambda limit: SlidingWindowCounterRateLimiter(max_requests=limit, window=1),
+}
+
+
+def bench_memory_per_key(factory, limit: int, num_keys: int) -> float:
+    """
+    Returns the bytes allocated per key for num_keys limiters that have each admitted a full
+    window of `limit` requests.
+    """
+    tracemalloc.start()
+    limiters = []
+    for _ in range(num_keys):
+        limiter = factory(limit)
+        for _ in range(limit):
+            limiter.allow_request()
+        limiters.append(limiter)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used / num_keys
+
+
+def bench_decision_latency(factory, limit: int, num_requests: int) -> float:
+    """
+    Returns the mean allow_request latency in nanoseconds for a single limiter.
+    """
+    limiter = factory(limit)
+    allow = limiter.allow_request
+    start = time.perf_counter_ns()
+    for _ in range(num_requests):
+        allow()
+    return (time.perf_counter_ns() - start) / num_requests
+
+
+# --- AsyncTokenBucketRateLimiter under load ---
+def bench_async_load(num_coroutines: int, capacity: int, refill_rate: float):
+    """
+    Starts num_coroutines coroutines that each await one token and returns
+    (elapsed seconds, expected seconds, whether admissions were FIFO).
+    """
+    async def run():
+        limiter = AsyncTokenBucketRateLimiter(capacity=capacity, refill_rate=refill_rate)
+        admitted = []
+
+        async def client(i):
+            await limiter.acquire()
+            admitted.append(i)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(num_coroutines)))
+        return time.perf_counter() - start, admitted == sorted(admitted)
+
+    elapsed, fifo = asyncio.run(run())
+    return elapsed, max(0, num_coroutines - capacity) / refill_rate, fifo
+
+
+# --- SharedTokenBucketTable across processes ---
+def _shared_worker(table, num_keys: int, num_requests: int, results: Queue):
+    admitted = 0
+    allow = table.allow_request
+    start = time.perf_counter()
+    for i in range(num_requests):
+        admitted += allow(i % num_keys)
+    elapsed = time.perf_counter() - start
+    table.close()
+    results.put((admitted, elapsed))
+
+
+def bench_shared_memory(num_processes: int, num_keys: int, capacity: int, requests_per_process: int):
+    """
+    Hammers one SharedTokenBucketTable (no refill) from num_processes processes and returns
+    (aggregate req/s, admitted, expected admitted). With a shared budget admitted must equal
+    num_keys * capacity no matter how many processes contend.
+    """
+    table = SharedTokenBucketTable(size=num_keys, capacity=capacity, refill_rate=0)
+    results = Queue()
+    workers = [Process(target=_shared_worker, args=(table, num_keys, requests_per_process, results))
+               for _ in range(num_processes)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    table.close()
+
+    admitted = sum(count for count, _ in outcomes)
+    slowest = max(elapsed for _, elapsed in outcomes)
+    return num_processes * requests_per_process / slowest, admitted, min(num_keys * capacity,
+                                                                         num_processes * requests_per_process)
+
+
+# --- CompositeRateLimiter overhead per tier ---
+def bench_composite_overhead(max_tiers: int, num_requests: int):
+    """
+    Returns {tier count: ns per allow_request} for composites of 1..max_tiers admitting token
+    buckets, plus a reject-early case where the first tier is exhausted.
+    """
+    big = num_requests * 2
+    results = {}
+    for num_tiers in range(1, max_tiers + 1):
+        composite = CompositeRateLimiter([TokenBucketRateLimiter(capacity=big, refill_rate=0)
+                                          for _ in range(num_tiers)])
+        results[num_tiers] = bench_decision_latency(lambda _: composite, 0, num_requests)
+
+    rejecting = CompositeRateLimiter([TokenBucketRateLimiter(capacity=0, refill_rate=0)] +
+                                     [TokenBucketRateLimiter(capacity=big, refill_rate=0)
+                                      for _ in range(max_tiers - 1)])
+    results["reject-early"] = bench_decision_latency(lambda _: rejecting, 0, num_requests)
+    return results
+
+
+if __name__ == "__main__":
+    num_keys = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    total_requests = num_keys
+
+    print(f"KeyedRateLimiter throughput ({num_keys} distinct keys, {total_requests} requests)")
+    for num_threads in (1, 4, 16):
+        rate = bench_keyed_throughput(num_threads, num_keys, total_requests // num_threads)
+        print(f"  threads={num_threads:>2}: {rate:>12,.0f} req/s")
+
+    print("\nBatch admission (batch_size=1000)")
+    for name, rate in bench_batch_admission(total_requests, 1000).items():
+        print(f"  {name:<14}: {rate:>14,.0f} req/s")
+
+    print("\nMemory per key and decision latency (limit=10000 req/s)")
+    for name, factory in LIMITER_FACTORIES.items():
+        memory = bench_memory_per_key(factory, 10_000, 20)
+        latency = bench_decision_latency(factory, 10_000, 200_000)
+        print(f"  {name:<20}: {memory:>10,.0f} B/key  {latency:>8,.0f} ns/decision")
+
+    print("\nAsyncTokenBucketRateLimiter load test (50000 coroutines, capacity=1000, 25000 tokens/s)")
+    elapsed, expected, fifo = bench_async_load(50_000, 1000, 25_000)
+    print(f"  elapsed={elapsed:.2f}s expected={expected:.2f}s fifo={fifo}")
+
+    print("\nSharedTokenBucketTable across processes (1000 keys, capacity=50, no refill)")
+    for num_processes in (1, 4, 8):
+        rate, admitted, expected = bench_shared_memory(num_processes, 1000, 50, 200_000)
+        print(f"  processes={num_processes}: {rate:>12,.0f} req/s  admitted={admitted} expected={expected}")
+
+    print("\nCompositeRateLimiter overhead")
+    plain = bench_decision_latency(LIMITER_FACTORIES["TokenBucket"], 10_000_000, 200_000)
+    print(f"  bare TokenBucket : {plain:>6,.0f} ns/decision")
+    for tiers, latency in bench_composite_overhead(5, 200_000).items():
+        print(f"  tiers={tiers!s:<12}: {latency:>6,.0f} ns/decision")
@@ -0,0 +1,92 @@
+import sys
+import time
+
+from Ratelimiter import (
+    NS_PER_SECOND,
+    LeakyBucketRateLimiter,
+    SlidingWindowCounterRateLimiter,
+    TokenBucketRateLimiter,
+    VirtualClock,
+)
+
+
+# --- Virtual-time replay ---
+def simulate(limiter, clock: VirtualClock, rate_fn, duration: float, tick_ns: int = 1_000_000):
+    """
+    Replays synthetic traffic against `limiter` in virtual time. All arrivals that fall inside
+    one tick share that tick's timestamp and are admitted with a single allow_many call, so the
+    cost of a run scales with the number of ticks rather than the number of requests.
+
+    :param limiter: A RateLimiter constructed with clock=clock.
+    :param clock: The VirtualClock driving the limiter.
+    :param rate_fn: Callable mapping elapsed virtual seconds to offered requests per second.
+    :param duration: Virtual seconds to simulate.
+    :param tick_ns: Virtual time resolution in nanoseconds.
+    """
+    num_ticks = int(duration * NS_PER_SECOND) // tick_ns
+    ticks_per_second = max(1, NS_PER_SECOND // tick_ns)
+    offered = admitted = 0
+    admitted_per_second = []
+    carry = 0.0  # fractional arrivals carried into the next tick
+
+    for tick in range(num_ticks):
+        carry += rate_fn(tick * tick_ns / NS_PER_SECOND) * tick_ns / NS_PER_SECOND
+        arrivals = int(carry)
+        carry -= arrivals
+        if arrivals:
+            offered += arrivals
+            granted = limiter.allow_many(arrivals)
+            admitted += granted
+        else:
+            granted = 0
+        if tick % ticks_per_second == 0:
+            admitted_per_second.append(0)
+        admitted_per_second[-1] += granted
+        clock.advance(ns=tick_ns)
+
+    return {
+        "offered": offered,
+        "admitted": admitted,
+        "rejected": offered - admitted,
+        "admitted_per_second": admitted_per_second,
+    }
+
+
+def constant_rate(rps: float):
+    return lambda t: rps
+
+
+def bursty_rate(base_rps: float, burst_rps: float, period: float, burst_length: float):
+    """
+    Offers base_rps, rising to burst_rps for the first burst_length seconds of every period.
+    """
+    return lambda t: burst_rps if t % period < burst_length else base_rps
+
+
+if __name__ == "__main__":
+    total_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000_000
+    offered_rps = 1_000_000
+    duration = total_requests / offered_rps
+    limit = 500_000
+
+    print(f"Replaying {total_requests:,} requests over {duration:.0f} virtual seconds "
+          f"({offered_rps:,} req/s offered, limit {limit:,} req/s)")
+    scenarios = {
+        "TokenBucket": lambda clock: TokenBucketRateLimiter(capacity=limit, refill_rate=limit, clock=clock),
+        "LeakyBucket": lambda clock: LeakyBucketRateLimiter(capacity=limit, leak_rate=limit, clock=clock),
+        "SlidingWindowCounter": lambda clock: SlidingWindowCounterRateLimiter(max_requests=limit, window=1, clock=clock),
+    }
+    for name, factory in scenarios.items():
+        clock = VirtualClock()
+        start = time.perf_counter()
+        result = simulate(factory(clock), clock, constant_rate(offered_rps), duration)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<20}: admitted={result['admitted']:>12,} rejected={result['rejected']:>12,} "
+              f"wall={elapsed:.2f}s")
+
+    print("\nBursty traffic against a token bucket (first 5 virtual seconds)")
+    clock = VirtualClock()
+    limiter = TokenBucketRateLimiter(capacity=2_000, refill_rate=1_000, clock=clock)
+    result = simulate(limiter, clock, bursty_rate(500, 5_000, period=2, burst_length=0.5), 5)
+    for second, admitted in enumerate(result["admitted_per_second"]):
+        print(f"  t={second}s admitted={admitted}")
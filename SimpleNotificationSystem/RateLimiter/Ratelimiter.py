@@ -1,5 +1,18 @@
+import asyncio
+import hashlib
+import os
 import time
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from multiprocessing import Lock as ProcessLock
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+
+try:
+    import numpy as np
+except ImportError:  # the vectorised TokenBucketTable is optional
+    np = None
 
 # --- RateLimiter Interface ---
 class RateLimiter(ABC):
@@ -10,77 +23,791 @@ class RateLimiter(ABC):
         """
         pass
 
+    def allow_many(self, n: int) -> int:
+        """
+        Admits up to n requests and returns how many were granted.
+        """
+        granted = 0
+        while granted < n and self.allow_request():
+            granted += 1
+        return granted
+
+    def acquire(self, tokens: int = 1) -> bool:
+        """
+        Admits a request costing `tokens` units only if the whole cost fits; a rejected
+        request consumes nothing.
+        """
+        if not self.can_acquire(tokens):
+            return False
+        self.commit(tokens)
+        return True
+
+    @abstractmethod
+    def can_acquire(self, tokens: int = 1) -> bool:
+        """
+        Reports whether `tokens` units would be admitted right now, without consuming them.
+        """
+        pass
+
+    @abstractmethod
+    def commit(self, tokens: int = 1):
+        """
+        Consumes `tokens` units after a successful can_acquire().
+        """
+        pass
+
+# --- Clocks ---
+NS_PER_SECOND = 1_000_000_000
+# Bucket levels are fixed-point integers: one token (or queued request) is UNITS_PER_TOKEN
+# units. Rates are kept in units per second, so any rate down to 1e-12 tokens/s (and every
+# multiple of that) is exact, and a bucket of up to 9,223,372 tokens fits an int64.
+UNITS_PER_TOKEN = 1_000_000_000_000
+
+
+def _units_per_second(rate_per_second: float) -> int:
+    units = round(rate_per_second * UNITS_PER_TOKEN)
+    if rate_per_second and not units:
+        raise ValueError(f"rate {rate_per_second}/s is below the 1e-12 tokens/s resolution")
+    return units
+
+
+def _accrued(units_per_second: int, since_ns: int, now_ns: int) -> int:
+    # Units accrued between two clock readings. Both ends are floored against the same
+    # origin, so the fractions carry over between calls instead of being lost on each one.
+    return now_ns * units_per_second // NS_PER_SECOND - since_ns * units_per_second // NS_PER_SECOND
+
+
+class VirtualClock:
+    def __init__(self, start_ns: int = 0):
+        """
+        A manually advanced nanosecond clock; pass it as `clock=` to drive limiters in simulated time.
+        """
+        self.now_ns = start_ns
+
+    def __call__(self) -> int:
+        return self.now_ns
+
+    def advance(self, seconds: float = 0, ns: int = 0):
+        self.now_ns += int(seconds * NS_PER_SECOND) + ns
+
 # --- Leaky Bucket Implementation ---
 class LeakyBucketRateLimiter(RateLimiter):
-    def __init__(self, capacity: int, leak_rate: float):
+    def __init__(self, capacity: int, leak_rate: float, clock=time.monotonic_ns):
         """
         :param capacity: Maximum number of requests that can be queued.
         :param leak_rate: Number of requests that leak per second.
+        :param clock: Zero-argument callable returning a monotonic time in integer nanoseconds.
         """
         self.capacity = capacity
         self.leak_rate = leak_rate  # requests per second
-        self.last_check = time.time()
-        self.current_level = 0.0  # using float to allow fractional leakage
+        self.clock = clock
+        self.last_check = clock()
+        # Integer fixed-point level (see UNITS_PER_TOKEN) to allow fractional leakage exactly.
+        self._level = 0
+        self._capacity_units = capacity * UNITS_PER_TOKEN
+        self._leak_per_second = _units_per_second(leak_rate)
 
-    def allow_request(self) -> bool:
-        now = time.time()
+    @property
+    def current_level(self) -> float:
+        return self._level / UNITS_PER_TOKEN
+
+    def _leak(self):
+        now = self.clock()
         # Calculate time passed since last check and leak the bucket accordingly
-        time_passed = now - self.last_check
-        leaked = time_passed * self.leak_rate
-        self.current_level = max(0.0, self.current_level - leaked)
+        self._level = max(0, self._level - _accrued(self._leak_per_second, self.last_check, now))
         self.last_check = now
 
-        if self.current_level < self.capacity:
+    def allow_request(self) -> bool:
+        self._leak()
+        if self._level < self._capacity_units:
             # There's space in the bucket, so add a request (fill the bucket) and allow the request.
-            self.current_level += 1
+            self._level += UNITS_PER_TOKEN
             return True
         else:
             # Bucket is full; reject the request.
             return False
 
+    def _free_slots(self) -> int:
+        # One clock read and one leak for the whole batch.
+        self._leak()
+        # A request is admitted while the level is below capacity, so a fractional gap still holds one.
+        return max(0, -((self._level - self._capacity_units) // UNITS_PER_TOKEN))
+
+    def allow_many(self, n: int) -> int:
+        granted = min(n, self._free_slots())
+        self._level += granted * UNITS_PER_TOKEN
+        return granted
+
+    def acquire(self, tokens: int = 1) -> bool:
+        if self._free_slots() < tokens:
+            return False
+        self._level += tokens * UNITS_PER_TOKEN
+        return True
+
+    def can_acquire(self, tokens: int = 1) -> bool:
+        return self._free_slots() >= tokens
+
+    def commit(self, tokens: int = 1):
+        self._level += tokens * UNITS_PER_TOKEN
+
 # --- Token Bucket Implementation ---
 class TokenBucketRateLimiter(RateLimiter):
-    def __init__(self, capacity: int, refill_rate: float):
+    def __init__(self, capacity: int, refill_rate: float, clock=time.monotonic_ns):
         """
         :param capacity: Maximum number of tokens in the bucket.
         :param refill_rate: Number of tokens added per second.
+        :param clock: Zero-argument callable returning a monotonic time in integer nanoseconds.
         """
         self.capacity = capacity
         self.refill_rate = refill_rate  # tokens per second
-        self.tokens = capacity  # start with a full bucket
-        self.last_check = time.time()
+        self.clock = clock
+        self.last_check = clock()
+        # Integer fixed-point token count (see UNITS_PER_TOKEN); start with a full bucket.
+        self._capacity_units = capacity * UNITS_PER_TOKEN
+        self._tokens = self._capacity_units
+        self._refill_per_second = _units_per_second(refill_rate)
 
-    def allow_request(self) -> bool:
-        now = time.time()
+    @property
+    def tokens(self) -> float:
+        return self._tokens / UNITS_PER_TOKEN
+
+    def _refill(self):
+        now = self.clock()
         # Refill tokens based on elapsed time
-        time_passed = now - self.last_check
-        added_tokens = time_passed * self.refill_rate
-        self.tokens = min(self.capacity, self.tokens + added_tokens)
+        self._tokens = min(self._capacity_units,
+                           self._tokens + _accrued(self._refill_per_second, self.last_check, now))
         self.last_check = now
 
-        if self.tokens >= 1:
+    def allow_request(self) -> bool:
+        self._refill()
+        if self._tokens >= UNITS_PER_TOKEN:
             # Consume one token for the incoming request
-            self.tokens -= 1
+            self._tokens -= UNITS_PER_TOKEN
             return True
         else:
             # Not enough tokens available; reject the request.
             return False
 
+    def allow_many(self, n: int) -> int:
+        # One clock read and one refill for the whole batch.
+        self._refill()
+        granted = min(n, self._tokens // UNITS_PER_TOKEN)
+        self._tokens -= granted * UNITS_PER_TOKEN
+        return granted
+
+    def acquire(self, tokens: int = 1) -> bool:
+        self._refill()
+        if self._tokens < tokens * UNITS_PER_TOKEN:
+            return False
+        self._tokens -= tokens * UNITS_PER_TOKEN
+        return True
+
+    def can_acquire(self, tokens: int = 1) -> bool:
+        self._refill()
+        return self._tokens >= tokens * UNITS_PER_TOKEN
+
+    def commit(self, tokens: int = 1):
+        self._tokens -= tokens * UNITS_PER_TOKEN
+
+# --- asyncio Token Bucket Implementation ---
+class AsyncTokenBucketRateLimiter:
+    def __init__(self, capacity: int, refill_rate: float):
+        """
+        Token bucket whose acquire() waits for tokens instead of rejecting.
+
+        :param capacity: Maximum number of tokens in the bucket.
+        :param refill_rate: Number of tokens added per second.
+        """
+        if refill_rate <= 0:
+            raise ValueError("refill_rate must be positive")
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.last_check = time.monotonic()
+        self.waiters = deque()  # (future, cost) in arrival order
+        self.timer = None  # the bucket's single pending wake-up
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_check) * self.refill_rate)
+        self.last_check = now
+
+    def allow_request(self) -> bool:
+        """
+        Non-blocking admission; never jumps ahead of coroutines already waiting.
+        """
+        self._refill()
+        if not self.waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, tokens: int = 1):
+        """
+        Waits until `tokens` tokens are available, serving callers in FIFO order.
+        """
+        if tokens > self.capacity:
+            raise ValueError("cannot acquire more tokens than the bucket capacity")
+        self._refill()
+        if not self.waiters and self.tokens >= tokens:
+            self.tokens -= tokens
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((future, tokens))
+        if self.timer is None:
+            self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Freeing the head of the queue may let the next waiter through sooner.
+            if self.waiters and self.waiters[0][0] is future:
+                self._cancel_timer()
+                self._wake()
+            raise
+
+    def _schedule(self):
+        # Sleep exactly until the head waiter's tokens will have refilled.
+        future, cost = self.waiters[0]
+        delay = max(0.0, (cost - self.tokens) / self.refill_rate)
+        self.timer = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    def _cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def _wake(self):
+        self.timer = None
+        self._refill()
+        waiters = self.waiters
+        while waiters:
+            future, cost = waiters[0]
+            if future.done():  # cancelled while waiting
+                waiters.popleft()
+                continue
+            if self.tokens < cost:
+                break
+            self.tokens -= cost
+            waiters.popleft()
+            future.set_result(None)
+        if waiters:
+            self._schedule()
+
+# --- Sliding Window Log Implementation ---
+class SlidingWindowLogRateLimiter(RateLimiter):
+    def __init__(self, max_requests: int, window: float, clock=time.monotonic_ns):
+        """
+        :param max_requests: Maximum number of requests admitted in any window.
+        :param window: Length of the sliding window in seconds.
+        :param clock: Zero-argument callable returning a monotonic time in integer nanoseconds.
+        """
+        self.max_requests = max_requests
+        self.window = window
+        self.window_ns = int(window * NS_PER_SECOND)
+        self.clock = clock
+        # Ring buffer of unboxed int64 admission timestamps; grows up to max_requests slots.
+        self.log = array("q")
+        self.oldest = 0  # index of the oldest timestamp once the ring is full
+        self.last_check = clock()
+
+    def allow_request(self) -> bool:
+        now = self.clock()
+        self.last_check = now
+        log = self.log
+        if len(log) < self.max_requests:
+            log.append(now)
+            return True
+
+        # The ring is full, so the slot we would overwrite holds the oldest admission.
+        if now - log[self.oldest] < self.window_ns:
+            return False
+        log[self.oldest] = now
+        self.oldest = (self.oldest + 1) % self.max_requests
+        return True
+
+    def _expired(self, now: int, limit: int) -> int:
+        # Counts, up to limit, the oldest recorded admissions that have left the window. They
+        # are in ring order, so the expired ones form a prefix found by binary search.
+        log, oldest, max_requests, cutoff = self.log, self.oldest, self.max_requests, now - self.window_ns
+        low, high = 0, min(limit, len(log))
+        while low < high:
+            middle = (low + high + 1) // 2
+            if log[(oldest + middle - 1) % max_requests] <= cutoff:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def _stamp(self, tokens: int, now: int):
+        # Records `tokens` admissions at `now`: first into unused slots, then over the oldest.
+        log, max_requests = self.log, self.max_requests
+        fresh = min(tokens, max_requests - len(log))
+        if fresh:
+            log.extend(array("q", [now]) * fresh)
+            tokens -= fresh
+        while tokens:
+            run = min(tokens, max_requests - self.oldest)
+            log[self.oldest:self.oldest + run] = array("q", [now]) * run
+            self.oldest = (self.oldest + run) % max_requests
+            tokens -= run
+
+    def allow_many(self, n: int) -> int:
+        now = self.clock()
+        self.last_check = now
+        free = self.max_requests - len(self.log)
+        granted = min(n, free)
+        if n > free:
+            # Slots appended now hold `now` and never count as expired.
+            granted += self._expired(now, n - free)
+        self._stamp(granted, now)
+        return granted
+
+    def acquire(self, tokens: int = 1) -> bool:
+        if not self.can_acquire(tokens):
+            return False
+        self.commit(tokens)
+        return True
+
+    def can_acquire(self, tokens: int = 1) -> bool:
+        now = self.clock()
+        self.last_check = now
+        if tokens > self.max_requests:
+            return False
+        reuse = tokens - (self.max_requests - len(self.log))
+        if reuse <= 0:
+            return True
+        # Admissions are in ring order, so the newest slot we would overwrite decides.
+        return now - self.log[(self.oldest + reuse - 1) % self.max_requests] >= self.window_ns
+
+    def commit(self, tokens: int = 1):
+        # Stamped with the time of the preceding can_acquire().
+        self._stamp(tokens, self.last_check)
+
+# --- Sliding Window Counter Implementation ---
+class SlidingWindowCounterRateLimiter(RateLimiter):
+    def __init__(self, max_requests: int, window: float, clock=time.monotonic_ns):
+        """
+        :param max_requests: Maximum (weighted) number of requests admitted per window.
+        :param window: Length of the window in seconds.
+        :param clock: Zero-argument callable returning a monotonic time in integer nanoseconds.
+        """
+        self.max_requests = max_requests
+        self.window = window
+        self.window_ns = int(window * NS_PER_SECOND)
+        self.clock = clock
+        self.window_start = clock()
+        self.previous_count = 0
+        self.current_count = 0
+        self.last_check = self.window_start
+
+    def _roll(self) -> int:
+        # Returns the previous window's weighted count, scaled by window_ns to stay in integers.
+        now = self.clock()
+        self.last_check = now
+        window_ns = self.window_ns
+        elapsed = now - self.window_start
+        if elapsed >= window_ns:
+            # Roll forward; if more than one full window passed the previous one is empty.
+            self.previous_count = self.current_count if elapsed < 2 * window_ns else 0
+            self.current_count = 0
+            self.window_start += (elapsed // window_ns) * window_ns
+            elapsed = now - self.window_start
+        # Weight the previous window by how much of it still overlaps the sliding window.
+        return self.previous_count * (window_ns - elapsed)
+
+    def allow_request(self) -> bool:
+        window_ns = self.window_ns
+        estimated = self._roll() + self.current_count * window_ns
+        if estimated + window_ns <= self.max_requests * window_ns:
+            self.current_count += 1
+            return True
+        return False
+
+    def allow_many(self, n: int) -> int:
+        window_ns = self.window_ns
+        room = (self.max_requests * window_ns - self._roll()) // window_ns - self.current_count
+        granted = max(0, min(n, room))
+        self.current_count += granted
+        return granted
+
+    def acquire(self, tokens: int = 1) -> bool:
+        if not self.can_acquire(tokens):
+            return False
+        self.commit(tokens)
+        return True
+
+    def can_acquire(self, tokens: int = 1) -> bool:
+        window_ns = self.window_ns
+        return self._roll() + (self.current_count + tokens) * window_ns <= self.max_requests * window_ns
+
+    def commit(self, tokens: int = 1):
+        self.current_count += tokens
+
+# --- Hierarchical (multi-tier) Rate Limiter ---
+class CompositeRateLimiter(RateLimiter):
+    def __init__(self, tiers):
+        """
+        Admits a request only if every tier admits it, and only then debits all tiers.
+
+        :param tiers: RateLimiters checked in order; put the cheapest or most restrictive tier
+                      first so a rejection skips the rest. Tiers may be shared between
+                      composites (e.g. one global tier under many tenants).
+        """
+        if not tiers:
+            raise ValueError("CompositeRateLimiter needs at least one tier")
+        for tier in tiers:
+            # Two-phase admission (can_acquire/commit) is part of the RateLimiter interface.
+            if not isinstance(tier, RateLimiter):
+                raise TypeError(f"tier {tier!r} is not a RateLimiter")
+        self.tiers = list(tiers)
+
+    @property
+    def last_check(self):
+        return max(tier.last_check for tier in self.tiers)
+
+    def can_acquire(self, tokens: int = 1) -> bool:
+        for tier in self.tiers:
+            if not tier.can_acquire(tokens):
+                return False
+        return True
+
+    def commit(self, tokens: int = 1):
+        for tier in self.tiers:
+            tier.commit(tokens)
+
+    # The inherited acquire() debits no tier unless every tier can take the cost.
+    def allow_request(self) -> bool:
+        return self.acquire(1)
+
+# --- Vectorised Token Bucket Table ---
+class TokenBucketTable:
+    def __init__(self, size: int, capacity: float, refill_rate: float):
+        """
+        A table of `size` token buckets addressed by integer key, evaluated with NumPy.
+
+        :param size: Number of buckets; keys are indices in [0, size).
+        :param capacity: Maximum number of tokens in each bucket.
+        :param refill_rate: Number of tokens added per second to each bucket.
+        """
+        if np is None:
+            raise ImportError("TokenBucketTable requires numpy")
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = np.full(size, capacity, dtype=np.float64)
+        self.last_check = np.full(size, time.monotonic(), dtype=np.float64)
+
+    def acquire_batch(self, keys, costs=None):
+        """
+        Evaluates a batch of (key, cost) requests in one vectorised call and returns a boolean
+        array of admissions. Requests for the same key are served in batch order and a key
+        stops admitting at its first request that does not fit.
+        """
+        keys = np.asarray(keys, dtype=np.intp)
+        costs = np.ones(len(keys)) if costs is None else np.asarray(costs, dtype=np.float64)
+        if len(keys) == 0:
+            return np.zeros(0, dtype=bool)
+
+        now = time.monotonic()
+        unique_keys, group = np.unique(keys, return_inverse=True)
+        group = group.reshape(-1)
+        available = np.minimum(
+            self.capacity,
+            self.tokens[unique_keys] + (now - self.last_check[unique_keys]) * self.refill_rate,
+        )
+
+        # Running cost of each request within its own key, in original batch order.
+        order = np.argsort(group, kind="stable")
+        sorted_group = group[order]
+        sorted_costs = costs[order]
+        running = np.cumsum(sorted_costs)
+        group_start = np.searchsorted(sorted_group, np.arange(len(unique_keys)))
+        running -= (running[group_start] - sorted_costs[group_start])[sorted_group]
+
+        granted = np.empty(len(keys), dtype=bool)
+        granted[order] = running <= available[sorted_group]
+        spent = np.bincount(group, weights=np.where(granted, costs, 0.0), minlength=len(unique_keys))
+
+        self.tokens[unique_keys] = available - spent
+        self.last_check[unique_keys] = now
+        return granted
+
+# --- Keyed (per-client) Rate Limiter ---
+class _Shard:
+    def __init__(self):
+        # key -> bucket, ordered from least to most recently used so idle
+        # buckets always sit at the front.
+        self.buckets = OrderedDict()
+        self.lock = Lock()
+
+
+class KeyedRateLimiter:
+    def __init__(self, bucket_factory, num_shards: int = 64, idle_timeout: float = 300.0,
+                 clock=time.monotonic_ns):
+        """
+        :param bucket_factory: Zero-argument callable returning a fresh RateLimiter for a new key.
+        :param num_shards: Number of independently locked partitions of the key space.
+        :param idle_timeout: Seconds without a request after which a key's bucket is dropped.
+        :param clock: Nanosecond clock; must be the same clock the buckets are created with.
+        """
+        if num_shards <= 0:
+            raise ValueError("num_shards must be positive")
+        self.bucket_factory = bucket_factory
+        self.num_shards = num_shards
+        self.idle_timeout = idle_timeout
+        self.idle_timeout_ns = int(idle_timeout * NS_PER_SECOND)
+        self.clock = clock
+        self.shards = [_Shard() for _ in range(num_shards)]
+
+    def _shard_for(self, key) -> _Shard:
+        return self.shards[hash(key) % self.num_shards]
+
+    def allow_request(self, key) -> bool:
+        shard = self._shard_for(key)
+        now = self.clock()
+        with shard.lock:
+            buckets = shard.buckets
+            bucket = buckets.get(key)
+            if bucket is None:
+                # Lazily create the bucket on first use of the key.
+                bucket = self.bucket_factory()
+                buckets[key] = bucket
+            else:
+                buckets.move_to_end(key)
+            allowed = bucket.allow_request()
+            self._expire_idle(shard, now)
+            return allowed
+
+    def _expire_idle(self, shard: _Shard, now: int) -> int:
+        # Buckets are kept in access order, so only the idle prefix is touched.
+        buckets = shard.buckets
+        expired = 0
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if now - bucket.last_check <= self.idle_timeout_ns:
+                break
+            del buckets[key]
+            expired += 1
+        return expired
+
+    def expire_idle(self) -> int:
+        """
+        Drops every bucket idle for longer than idle_timeout and returns how many were removed.
+        """
+        now = self.clock()
+        expired = 0
+        for shard in self.shards:
+            with shard.lock:
+                expired += self._expire_idle(shard, now)
+        return expired
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self.shards)
+
+# --- Multi-process Shared-Memory Token Buckets ---
+class SharedTokenBucketTable:
+    # Each slot is three int64s: fixed-point tokens, the last refill time in ns, and the
+    # fingerprint of the key that owns it (0 = free; any clock value is a valid refill time).
+    SLOT_WORDS = 3
+
+    def __init__(self, size: int, capacity: int, refill_rate: float, num_locks: int = 64,
+                 clock=time.monotonic_ns):
+        """
+        A table of token buckets in multiprocessing.shared_memory, so every worker process on
+        the host shares one budget per key. Create it before forking (or pass it to the worker
+        processes); slots are guarded by striped process locks.
+
+        A key claims a slot on first use and keeps it: each slot records its key's 64-bit
+        fingerprint, and a key whose home slot belongs to another key probes the following
+        slots. Slots are never freed, so size the table for the number of distinct keys it
+        will see (with headroom; long probe runs slow admission down). Once every slot is
+        taken, a new key falls back to sharing its home slot's budget.
+
+        :param size: Number of bucket slots, at least the number of distinct keys.
+        :param capacity: Maximum number of tokens in each bucket.
+        :param refill_rate: Number of tokens added per second to each bucket.
+        :param num_locks: Number of process locks the slots are striped across.
+        :param clock: Nanosecond clock shared by all processes (time.monotonic_ns is host-wide).
+        """
+        if capacity * UNITS_PER_TOKEN >= 2 ** 63:
+            raise ValueError("capacity too large for an int64 slot")
+        self.size = size
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.clock = clock
+        self.locks = [ProcessLock() for _ in range(num_locks)]
+        self.shm = SharedMemory(create=True, size=size * self.SLOT_WORDS * 8)
+        self.shm.buf[:] = bytes(self.shm.size)
+        self._owner_pid = os.getpid()  # forked workers inherit this, so compare it on close
+        self._attach()
+
+    def _attach(self):
+        self._slots = self.shm.buf.cast("q")
+        self._capacity_units = self.capacity * UNITS_PER_TOKEN
+        self._refill_per_second = _units_per_second(self.refill_rate)
+
+    def __getstate__(self):
+        # Lets the table be passed to spawned worker processes; they re-attach by name.
+        return {
+            "size": self.size,
+            "capacity": self.capacity,
+            "refill_rate": self.refill_rate,
+            "clock": self.clock,
+            "locks": self.locks,
+            "name": self.shm.name,
+        }
+
+    def __setstate__(self, state):
+        self.size = state["size"]
+        self.capacity = state["capacity"]
+        self.refill_rate = state["refill_rate"]
+        self.clock = state["clock"]
+        self.locks = state["locks"]
+        self.shm = SharedMemory(name=state["name"])
+        self._owner_pid = None
+        self._attach()
+
+    @staticmethod
+    def fingerprint(key) -> int:
+        """
+        Nonzero int64 identifying `key` in every process. Built-in str hashing is salted per
+        process, so other keys use a blake2b digest of their repr instead.
+        """
+        if isinstance(key, int) and 0 <= key < 2 ** 63 - 1:
+            return key + 1
+        digest = int.from_bytes(hashlib.blake2b(repr(key).encode(), digest_size=8).digest(), "little")
+        return (digest >> 1) or 1
+
+    def slot_for(self, key) -> int:
+        # The home slot; acquire() probes onwards from here when another key owns it.
+        return (self.fingerprint(key) - 1) % self.size
+
+    def _claim(self, fingerprint, home):
+        # Returns the slot owned (or newly claimed) by fingerprint, probing from its home slot.
+        # Each slot is inspected under its own lock, so two processes cannot claim the same one.
+        slots, locks, words = self._slots, self.locks, self.SLOT_WORDS
+        for probe in range(self.size):
+            slot = (home + probe) % self.size
+            owner = slots[slot * words + 2]
+            if owner == fingerprint:
+                return slot
+            if owner == 0:
+                with locks[slot % len(locks)]:
+                    owner = slots[slot * words + 2]
+                    if owner == 0:
+                        slots[slot * words + 2] = fingerprint
+                        slots[slot * words] = self._capacity_units  # first use starts full
+                        slots[slot * words + 1] = self.clock()
+                        return slot
+                    if owner == fingerprint:
+                        return slot
+        return home  # table full: share the home slot's budget
+
+    def acquire(self, key, tokens: int = 1) -> bool:
+        fingerprint = self.fingerprint(key)
+        home = (fingerprint - 1) % self.size
+        slots = self._slots
+        slot = home if slots[home * self.SLOT_WORDS + 2] == fingerprint else self._claim(fingerprint, home)
+        base = slot * self.SLOT_WORDS
+        with self.locks[slot % len(self.locks)]:
+            now = self.clock()
+            available = min(self._capacity_units,
+                            slots[base] + _accrued(self._refill_per_second, slots[base + 1], now))
+            cost = tokens * UNITS_PER_TOKEN
+            granted = available >= cost
+            if granted:
+                available -= cost
+            slots[base] = available
+            slots[base + 1] = now
+            return granted
+
+    def allow_request(self, key) -> bool:
+        return self.acquire(key)
+
+    def close(self):
+        """
+        Detaches this process from the table; only the process that created it frees the segment.
+        """
+        self._slots.release()
+        self.shm.close()
+        if self._owner_pid == os.getpid():
+            self.shm.unlink()
+
 # --- Example Usage ---
 if __name__ == "__main__":
+    # Drive the examples from a virtual clock so they run instantly.
+    clock = VirtualClock()
+
     # Create instances of each rate limiter.
-    leaky_bucket = LeakyBucketRateLimiter(capacity=5, leak_rate=1)  # 1 request per second leakage, max 5 requests queued
-    token_bucket = TokenBucketRateLimiter(capacity=5, refill_rate=1)  # 1 token per second, bucket size 5
+    leaky_bucket = LeakyBucketRateLimiter(capacity=5, leak_rate=1, clock=clock)  # 1 request per second leakage, max 5 requests queued
+    token_bucket = TokenBucketRateLimiter(capacity=5, refill_rate=1, clock=clock)  # 1 token per second, bucket size 5
 
     # Simulate a burst of requests
     print("Leaky Bucket Results:")
     for i in range(10):
         allowed = leaky_bucket.allow_request()
         print(f"Request {i+1}: {'Allowed' if allowed else 'Rejected'}")
-        time.sleep(0.3)  # simulate time between requests
+        clock.advance(0.3)  # simulate time between requests
 
     print("\nToken Bucket Results:")
     for i in range(10):
         allowed = token_bucket.allow_request()
         print(f"Request {i+1}: {'Allowed' if allowed else 'Rejected'}")
-        time.sleep(0.3)  # simulate time between requests
+        clock.advance(0.3)  # simulate time between requests
+
+    print("\nSliding Window Log Results:")
+    sliding_log = SlidingWindowLogRateLimiter(max_requests=3, window=1)
+    for i in range(5):
+        print(f"Request {i+1}: {'Allowed' if sliding_log.allow_request() else 'Rejected'}")
+
+    print("\nSliding Window Counter Results:")
+    sliding_counter = SlidingWindowCounterRateLimiter(max_requests=3, window=1)
+    for i in range(5):
+        print(f"Request {i+1}: {'Allowed' if sliding_counter.allow_request() else 'Rejected'}")
+
+    print("\nAsync Token Bucket Results:")
+
+    async def async_demo():
+        async_bucket = AsyncTokenBucketRateLimiter(capacity=2, refill_rate=5)
+        started = time.monotonic()
+
+        async def request(i):
+            await async_bucket.acquire()
+            print(f"Request {i+1}: admitted after {time.monotonic() - started:.2f}s")
+
+        await asyncio.gather(*(request(i) for i in range(5)))
+
+    asyncio.run(async_demo())
+
+    print("\nHierarchical Results (global 4/s, tenant 3/s):")
+    global_tier = TokenBucketRateLimiter(capacity=4, refill_rate=4, clock=clock)
+    tenants = {
+        name: CompositeRateLimiter([global_tier, TokenBucketRateLimiter(capacity=3, refill_rate=3, clock=clock)])
+        for name in ("acme", "globex")
+    }
+    for tenant in ["acme", "acme", "acme", "acme", "globex", "globex"]:
+        allowed = tenants[tenant].allow_request()
+        print(f"Request from {tenant}: {'Allowed' if allowed else 'Rejected'}")
+
+    print("\nBatch Admission Results:")
+    batch_bucket = TokenBucketRateLimiter(capacity=5, refill_rate=1)
+    print(f"allow_many(3): {batch_bucket.allow_many(3)} granted")
+    print(f"allow_many(3): {batch_bucket.allow_many(3)} granted")
+    print(f"acquire(tokens=2): {batch_bucket.acquire(tokens=2)}")
+
+    if np is not None:
+        table = TokenBucketTable(size=4, capacity=2, refill_rate=1)
+        print("acquire_batch:", table.acquire_batch([0, 0, 0, 1, 2], [1, 1, 1, 3, 2]).tolist())
+
+    print("\nKeyed Token Bucket Results:")
+    keyed = KeyedRateLimiter(lambda: TokenBucketRateLimiter(capacity=2, refill_rate=1))
+    for api_key in ["alice", "alice", "alice", "bob"]:
+        allowed = keyed.allow_request(api_key)
+        print(f"Request from {api_key}: {'Allowed' if allowed else 'Rejected'}")
+
+    print("\nShared-Memory Token Bucket Results:")
+    shared = SharedTokenBucketTable(size=1024, capacity=2, refill_rate=1)
+    for api_key in ["alice", "alice", "alice", "bob"]:
+        allowed = shared.allow_request(api_key)
+        print(f"Request from {api_key}: {'Allowed' if allowed else 'Rejected'}")
+    shared.close()
@@ -0,0 +1,316 @@
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+import time
+from datetime import datetime
+from threading import Lock
+
+from Logger import LoggerLevel, LogProcessor
+
+# Segment file: header, then records back to back; a zero length marks the end.
+#   header: magic, sequence number, wall-clock and monotonic ns at creation
+#   record: length, level, template id, monotonic ns, then the packed args
+#   definition (level 0): the template's argument codes, a NUL and its text
+# The length is written last, so a reader never sees a half-written record.
+SEGMENT_HEADER = struct.Struct("<4sQqq")
+RECORD_FORMAT = "<IBIq"
+RECORD_HEADER = struct.Struct(RECORD_FORMAT)
+RECORD_LENGTH = struct.Struct("<I")
+MAGIC = b"BLG2"
+DEFINITION = 0
+TRUNCATED = " [truncated]"
+
+# An argument's Python type picks its code; the codes live in the template definition, so a
+# record carries only the values. Anything not listed is stored as str(arg).
+ARG_CODES = {int: "q", float: "d", bool: "?", bytes: "b", str: "s"}
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+FIXED_ARGS = {"q": struct.Struct("<q"), "d": struct.Struct("<d"), "?": struct.Struct("<?")}
+LEVEL_CODES = {level: level.value for level in LoggerLevel}
+
+
+class BinaryLogSink(LogProcessor):
+  """
+  Terminal LogProcessor that appends structured binary records to a ring of pre-allocated,
+  memory-mapped segment files instead of formatting and printing them.
+
+  record(level, template, *args) stores the level, a monotonic timestamp, the template's id
+  and the packed args; the text is only produced at read time (see read_records and the
+  decode CLI). log(level, message) records the message as the single argument of "{}". A
+  template is identified by its text and argument types, and its definition is written once
+  per segment, so every segment decodes on its own. When the last segment fills up, writing
+  wraps around and overwrites the oldest one.
+
+  A log() message too long for a segment is truncated to fit; a record() that cannot fit is
+  dropped and counted in `dropped`, so logging never raises into the caller.
+
+  In CPython a record costs about as much as formatting and printing a short line: the
+  LoggerBenchmark sink comparison measures it somewhat slower than the print chain. What it
+  saves is bytes per record and the text formatting of its args, so it pays off for records
+  with costly args and for volumes where the text log's size is the limit, not for speed.
+  """
+
+  def __init__(self, next_log_processor=None, directory=None, segment_size=4 * 1024 * 1024,
+               num_segments=8):
+    super().__init__(next_log_processor)
+    if segment_size <= SEGMENT_HEADER.size + RECORD_HEADER.size:
+      raise ValueError("segment_size is too small")
+    self.directory = directory if directory is not None else tempfile.mkdtemp(prefix="binary-log-")
+    os.makedirs(self.directory, exist_ok=True)
+    self.segment_size = segment_size
+    self.num_segments = num_segments
+    self.plans = {}  # (template, *argument types) -> (template id, codes, Struct or None, definition size)
+    self.dropped = 0
+    # Largest definition + record that fits an empty segment and leaves its zero terminator.
+    self.max_payload = segment_size - SEGMENT_HEADER.size - RECORD_HEADER.size
+    # Bytes left for a log() message after its "{}" definition and record framing.
+    self.max_message_bytes = (self.max_payload - (RECORD_HEADER.size + len(b"s\0{}"))
+                              - RECORD_HEADER.size - RECORD_LENGTH.size)
+    self.lock = Lock()
+    self.files = []
+    self.maps = []
+    sequences = []
+    for slot in range(num_segments):
+      path = os.path.join(self.directory, f"segment-{slot:03d}.blog")
+      segment_file = open(path, "r+b" if os.path.exists(path) else "w+b")
+      segment_file.truncate(segment_size)
+      segment_map = mmap.mmap(segment_file.fileno(), segment_size)
+      self.files.append(segment_file)
+      self.maps.append(segment_map)
+      magic, sequence, _, _ = SEGMENT_HEADER.unpack_from(segment_map)
+      sequences.append(sequence if magic == MAGIC else -1)
+    # Continue after the newest segment left by a previous run.
+    newest = max(range(num_segments), key=sequences.__getitem__)
+    self.sequence = sequences[newest]
+    self.slot = newest
+    self._start_segment((newest + 1) % num_segments if self.sequence >= 0 else 0)
+
+  def _start_segment(self, slot):
+    # Caller holds self.lock (or is the constructor).
+    self.slot = slot
+    self.sequence += 1
+    self.map = self.maps[slot]
+    self.map[:] = bytes(self.segment_size)  # clear stale records from the previous lap
+    SEGMENT_HEADER.pack_into(self.map, 0, MAGIC, self.sequence, time.time_ns(), time.monotonic_ns())
+    self.offset = SEGMENT_HEADER.size
+    self.defined = set()  # template ids whose text is already in this segment
+
+  def is_enabled(self, log_level):
+    return True
+
+  def log(self, log_level, message):
+    message = self._record_message(log_level, message)
+    if self.next_log_processor is not None:
+      self.next_log_processor.log(log_level, message)
+
+  def format(self, log_level, message):
+    # An AsyncLogger or LevelDispatcher in front formats instead of calling log(); the sink
+    # records here too and returns the line of any processor after it, or None.
+    message = self._record_message(log_level, message)
+    if self.next_log_processor is not None:
+      return self.next_log_processor.format(log_level, message)
+    return None
+
+  def _record_message(self, log_level, message):
+    # Records message as the argument of "{}", truncated to fit, and returns what was recorded.
+    limit = self.max_message_bytes
+    if len(message) > limit // 4:  # four bytes per character at most, so shorter always fits
+      data = message.encode()
+      if len(data) > limit:
+        message = data[:max(0, limit - len(TRUNCATED))].decode(errors="ignore") + TRUNCATED
+    self.record(log_level, "{}", message)
+    return message
+
+  def record(self, log_level, template, *args):
+    timestamp = time.monotonic_ns()
+    key = (template, *map(type, args))
+    plan = self.plans.get(key)
+    if plan is None:
+      plan = self._plan(key)
+    template_id, codes, packer, definition_size = plan
+    if packer is not None:
+      # Only fixed-size args: one precompiled Struct packs the whole record.
+      size = packer.size
+    else:
+      # Strings make the layout vary per call, so the args are packed piece by piece with
+      # precompiled Structs and copied in after the header.
+      pieces = []
+      try:
+        for code, arg in zip(codes, args):
+          if code == "s" or code == "b":
+            data = arg if code == "b" else (arg if type(arg) is str else str(arg)).encode()
+            pieces += (RECORD_LENGTH.pack(len(data)), data)
+          else:
+            pieces.append(FIXED_ARGS[code].pack(arg))
+      except struct.error:
+        return self._record_as_text(log_level, template, args)  # an int beyond int64
+      payload = b"".join(pieces)
+      size = RECORD_HEADER.size + len(payload)
+
+    if size + definition_size > self.max_payload:
+      with self.lock:
+        self.dropped += 1
+      return
+
+    with self.lock:
+      if template_id not in self.defined:
+        self._define(template_id, codes, template, size)
+      elif self.offset + size + RECORD_HEADER.size > self.segment_size:
+        self._roll(size)
+        self._define(template_id, codes, template, size)
+      start = self.offset
+      if packer is None:
+        RECORD_HEADER.pack_into(self.map, start, 0, LEVEL_CODES[log_level], template_id, timestamp)
+        self.map[start + RECORD_HEADER.size:start + size] = payload
+      else:
+        try:
+          packer.pack_into(self.map, start, 0, LEVEL_CODES[log_level], template_id, timestamp, *args)
+        except struct.error:
+          start = None  # an int beyond int64; nothing was published
+      if start is not None:
+        RECORD_LENGTH.pack_into(self.map, start, size)  # publishes the record
+        self.offset = start + size
+        return
+    self._record_as_text(log_level, template, args)
+
+  def _record_as_text(self, log_level, template, args):
+    # Records ints that do not fit an int64 as their text.
+    self.record(log_level, template, *(str(arg) if type(arg) is int and not INT64_MIN <= arg <= INT64_MAX
+                                       else arg for arg in args))
+
+  def _plan(self, key):
+    with self.lock:
+      plan = self.plans.get(key)
+      if plan is None:
+        template = key[0]
+        codes = "".join(ARG_CODES.get(kind, "s") for kind in key[1:])
+        fixed = all(code in FIXED_ARGS for code in codes)
+        plan = (len(self.plans), codes, struct.Struct(RECORD_FORMAT + codes) if fixed else None,
+                RECORD_HEADER.size + len(codes) + 1 + len(template.encode()))
+        self.plans[key] = plan
+      return plan
+
+  def _define(self, template_id, codes, template, record_size):
+    # Caller holds self.lock. Writes the definition ahead of the record that needs it.
+    text = codes.encode() + b"\0" + template.encode()
+    size = RECORD_HEADER.size + len(text)
+    if self.offset + size + record_size + RECORD_HEADER.size > self.segment_size:
+      self._roll(size + record_size)
+    start = self.offset
+    self.map[start + RECORD_HEADER.size:start + size] = text
+    RECORD_HEADER.pack_into(self.map, start, 0, DEFINITION, template_id, 0)
+    RECORD_LENGTH.pack_into(self.map, start, size)
+    self.offset += size
+    self.defined.add(template_id)
+
+  def _roll(self, needed):
+    # Caller holds self.lock; the trailing RECORD_HEADER.size bytes keep a zero terminator.
+    if SEGMENT_HEADER.size + needed + RECORD_HEADER.size > self.segment_size:
+      raise ValueError("record is larger than a segment")
+    self._start_segment((self.slot + 1) % self.num_segments)
+
+  def flush(self):
+    with self.lock:
+      for segment_map in self.maps:
+        segment_map.flush()
+
+  def close(self):
+    with self.lock:
+      for segment_map, segment_file in zip(self.maps, self.files):
+        segment_map.flush()
+        segment_map.close()
+        segment_file.close()
+      self.maps, self.files = [], []
+
+
+def _decode_args(data, codes, position):
+  args = []
+  for code in codes:
+    if code == "s" or code == "b":
+      length = RECORD_LENGTH.unpack_from(data, position)[0]
+      position += RECORD_LENGTH.size
+      value = bytes(data[position:position + length])
+      args.append(value.decode() if code == "s" else value)
+      position += length
+    else:
+      unpacker = FIXED_ARGS[code]
+      args.append(unpacker.unpack_from(data, position)[0])
+      position += unpacker.size
+  return args
+
+
+def read_segment(path):
+  """
+  Yields (wall_clock_ns, LoggerLevel, template, args) for every record in one segment file,
+  or nothing when the file is not an initialised segment.
+  """
+  with open(path, "rb") as segment_file:
+    data = segment_file.read()
+  if len(data) < SEGMENT_HEADER.size:
+    return
+  magic, _, wall_ns, monotonic_ns = SEGMENT_HEADER.unpack_from(data)
+  if magic != MAGIC:
+    return
+  templates = {}
+  position = SEGMENT_HEADER.size
+  while position + RECORD_HEADER.size <= len(data):
+    length, level, template_id, timestamp = RECORD_HEADER.unpack_from(data, position)
+    if length == 0:
+      break
+    body = position + RECORD_HEADER.size
+    if level == DEFINITION:
+      codes, _, text = data[body:position + length].decode().partition("\0")
+      templates[template_id] = (codes, text)
+    else:
+      codes, text = templates[template_id]
+      args = _decode_args(data, codes, body)
+      yield wall_ns + timestamp - monotonic_ns, LoggerLevel(level), text, args
+    position += length
+
+
+def read_records(directory):
+  """
+  Yields the records of every segment in `directory`, oldest segment first.
+  """
+  segments = []
+  for name in os.listdir(directory):
+    path = os.path.join(directory, name)
+    if name.endswith(".blog"):
+      with open(path, "rb") as segment_file:
+        header = segment_file.read(SEGMENT_HEADER.size)
+      if len(header) == SEGMENT_HEADER.size and header[:4] == MAGIC:
+        segments.append((SEGMENT_HEADER.unpack(header)[1], path))
+  for _, path in sorted(segments):
+    yield from read_segment(path)
+
+
+def format_record(wall_ns, log_level, template, args):
+  message = template.format(*args) if args else template
+  return f"{datetime.fromtimestamp(wall_ns / 1e9).isoformat()} {log_level.name}: {message}"
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Write or decode binary log segments")
+  commands = parser.add_subparsers(dest="command", required=True)
+  decode = commands.add_parser("decode", help="print the records of a log directory as text")
+  decode.add_argument("directory")
+  decode.add_argument("--level", choices=[level.name for level in LoggerLevel], action="append",
+                      help="only print these levels")
+  demo = commands.add_parser("demo", help="write a few records and decode them")
+  args = parser.parse_args()
+
+  if args.command == "decode":
+    wanted = {LoggerLevel[name] for name in args.level} if args.level else None
+    for record in read_records(args.directory):
+      if wanted is None or record[1] in wanted:
+        print(format_record(*record))
+  else:
+    sink = BinaryLogSink(segment_size=256, num_segments=3)
+    for i in range(20):
+      sink.record(LoggerLevel.INFO, "request {} served in {:.1f}ms by {}", i, 4.5 + i, "api-1")
+    sink.log(LoggerLevel.ERROR, "upstream timeout")
+    sink.close()
+    print(f"Decoding {sink.directory} (the ring kept the newest segments):")
+    for record in read_records(sink.directory):
+      print(format_record(*record))
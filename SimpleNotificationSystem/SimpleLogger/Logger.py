@@ -1,5 +1,10 @@
+import re
+import sys
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
 from enum import Enum
+from threading import Condition, Event, Lock, Thread
 
 class LoggerLevel(Enum):
   INFO = 1
@@ -7,45 +12,547 @@ class LoggerLevel(Enum):
   ERROR = 3
   SYSTEM = 4
 
+  # Members are singletons compared by identity; the identity hash keeps dispatch-table
+  # lookups in C instead of calling Enum.__hash__.
+  __hash__ = object.__hash__
+
 class LogProcessor(ABC):
+  level = None  # the LoggerLevel a handler formats; None for processors that pass records on
+
   def __init__(self, next_log_processor):
     self.next_log_processor = next_log_processor
-  
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    for name in ("log", "format", "_admit"):
+      if name in cls.__dict__:
+        _log_method_codes.add(cls.__dict__[name].__code__)
+
+  def is_enabled(self, log_level: LoggerLevel) -> bool:
+    # True when some processor in the chain handles log_level; lets callers skip formatting.
+    if self.level == log_level:
+      return True
+    return self.next_log_processor is not None and self.next_log_processor.is_enabled(log_level)
+
   def log(self, log_level: LoggerLevel, message: str):
+    line = self.format(log_level, message)
+    if line is not None:
+      print(line)
+
+  @abstractmethod
+  def format(self, log_level: LoggerLevel, message: str):
+    # Returns the line the chain prints for this record, or None when no processor handles it.
+    pass
+
+  def flush(self):
+    # Emits anything a processor is holding back, then flushes the rest of the chain.
+    if self.next_log_processor is not None:
+      self.next_log_processor.flush()
+
+# Code of every log(), format() and _admit() in the hierarchy, so SamplingLogger can step
+# over them to the caller.
+_log_method_codes = {LogProcessor.log.__code__}
+
+class LevelLogger(LogProcessor):
+  """
+  Handler for one level: renders records of `level` and passes every other level down the chain.
+  """
+
+  def format(self, log_level, message):
+    if log_level == self.level:
+      return self.render(message)
     if self.next_log_processor is not None:
-      self.next_log_processor.log(log_level, message)
+      return self.next_log_processor.format(log_level, message)
+    return None
+
+  @abstractmethod
+  def render(self, message: str) -> str:
+    # Turns a message of this handler's level into its output line.
+    pass
+
+class InfoLogger(LevelLogger):
+  level = LoggerLevel.INFO
 
-class InfoLogger(LogProcessor):
   def __init__(self, next_log_processor):
     super().__init__(next_log_processor)
-  
-  def log(self, log_level, message):
-    if log_level == LoggerLevel.INFO:
-      print("INFO: " + message)
-    else:
-      super().log(log_level, message)
 
-class ErrorLogger(LogProcessor):
+  def render(self, message):
+    return "INFO: " + message
+
+class ErrorLogger(LevelLogger):
+  level = LoggerLevel.ERROR
+
+  def __init__(self, next_log_processor):
+    super().__init__(next_log_processor)
+
+  def render(self, message):
+    return "ERROR: " + message
+
+class DebugLogger(LevelLogger):
+  level = LoggerLevel.DEBUG
+
   def __init__(self, next_log_processor):
     super().__init__(next_log_processor)
-  
+
+  def render(self, message):
+    return "DEBUG: " + message
+
+class LevelDispatcher(LogProcessor):
+  """
+  Front of a chain that walks it once, at construction, to record which handler renders
+  each level. log(), format() and is_enabled() are then a single dict lookup instead of a
+  walk down the chain, and levels nobody handles (SYSTEM in the default chain) cost nothing.
+
+  The walk stops at the first processor without a level (an AsyncLogger, say): every level
+  not claimed before it is passed to that processor's log(), as the chain would forward it.
+  """
+
+  def __init__(self, next_log_processor):
+    super().__init__(next_log_processor)
+    self.renderers = {}  # level -> render of the handler that takes it
+    self.forwards = {}  # level -> processor without a level that receives it
+    processor = next_log_processor
+    while processor is not None:
+      if processor.level is None:
+        for log_level in LoggerLevel:
+          if log_level not in self.renderers and processor.is_enabled(log_level):
+            self.forwards[log_level] = processor
+        break
+      self.renderers.setdefault(processor.level, processor.render)
+      processor = processor.next_log_processor
+
+  def is_enabled(self, log_level):
+    return log_level in self.renderers or log_level in self.forwards
+
   def log(self, log_level, message):
-    if log_level == LoggerLevel.ERROR:
-      print("ERROR: " + message)
-    else:
-      super().log(log_level, message)
+    render = self.renderers.get(log_level)
+    if render is not None:
+      print(render(message))
+    elif self.forwards:
+      processor = self.forwards.get(log_level)
+      if processor is not None:
+        processor.log(log_level, message)
+
+  def format(self, log_level, message):
+    render = self.renderers.get(log_level)
+    if render is not None:
+      return render(message)
+    processor = self.forwards.get(log_level)
+    return processor.format(log_level, message) if processor is not None else None
+
+class FilterProcessor(LogProcessor):
+  """
+  Base of processors that decide which records go on instead of rendering them.
+  _admit(level, message) returns the records to pass on for one incoming record, summaries
+  included. log() hands them to the next processor's log(); format() returns the lines the
+  rest of the chain formats for them, so a LevelDispatcher in front filters the same way.
+
+  Records a filter releases on its own (on flush(), on a timer or on eviction) go to
+  `emit`, the next processor's log() unless an AsyncLogger in front routes them to its queue.
+  """
 
-class DebugLogger(LogProcessor):
   def __init__(self, next_log_processor):
     super().__init__(next_log_processor)
-  
+    self.emit = None  # callable taking (level, message); None for next_log_processor.log
+
+  def _admit(self, log_level, message):
+    # Returns a list of the (level, message) records to pass on.
+    return [(log_level, message)]
+
   def log(self, log_level, message):
-    if log_level == LoggerLevel.DEBUG:
-      print("DEBUG: " + message)
+    self._pass_on(self._admit(log_level, message))
+
+  def format(self, log_level, message):
+    lines = []
+    for record in self._admit(log_level, message):
+      line = self.next_log_processor.format(*record)
+      if line is not None:
+        lines.append(line)
+    return "\n".join(lines) if lines else None
+
+  def _pass_on(self, records):
+    emit = self.emit or self.next_log_processor.log
+    for record in records:
+      emit(*record)
+
+  def close(self):
+    self.flush()
+
+class SamplingLogger(FilterProcessor):
+  """
+  Passes on the first `burst` records logged from each call site, then one in every `every`.
+  The call site is the first frame that is not a processor's log() or format(), so it is the
+  line that called log() however many processors sit in front. Counts are updated without a
+  lock and may lose an increment under contention, which only shifts which record is sampled.
+  """
+
+  def __init__(self, next_log_processor, every=100, burst=10):
+    super().__init__(next_log_processor)
+    self.every = every
+    self.burst = burst
+    self.counts = {}  # (code object, line number) -> records seen
+    self.sampled_out = 0
+
+  def _admit(self, log_level, message):
+    frame = sys._getframe(1)
+    while frame.f_code in _log_method_codes:
+      frame = frame.f_back
+    site = (frame.f_code, frame.f_lineno)
+    count = self.counts.get(site, 0) + 1
+    self.counts[site] = count
+    if count <= self.burst or count % self.every == 0:
+      return [(log_level, message)]
+    self.sampled_out += 1
+    return []
+
+def numbers_masked(message):
+  # Default template key: "timeout after 31ms" and "timeout after 7ms" share a template.
+  return re.sub(r"\d+", "#", message)
+
+def _suppressed_summary(log_level, message, suppressed):
+  return log_level, f"{message} [rate limited: {suppressed} similar messages suppressed]"
+
+class RateLimitedLogger(FilterProcessor):
+  """
+  Token bucket per message template: each template may pass `burst` records at once and
+  `rate` per second after that. The first record let through after a suppression carries a
+  count of what was dropped. Templates come from template_key(message) and only the
+  max_templates most recently used keep a bucket.
+
+  Counts not yet reported that way are emitted, with the last suppressed message, when the
+  template's bucket is evicted and on flush(). Pass flush_interval to flush on a timer;
+  otherwise call flush() (or close()) before shutting down.
+  """
+
+  def __init__(self, next_log_processor, rate=10.0, burst=20, template_key=numbers_masked,
+               max_templates=10000, clock=time.monotonic, flush_interval=None):
+    super().__init__(next_log_processor)
+    self.rate = rate
+    self.burst = burst
+    self.template_key = template_key
+    self.max_templates = max_templates
+    self.clock = clock
+    # template -> [tokens, last refill, suppressed since last pass, last suppressed (level, message)]
+    self.buckets = OrderedDict()
+    self.lock = Lock()
+    self._closed = Event()
+    self._flusher = None
+    if flush_interval:
+      self._flusher = Thread(target=self._flush_periodically, args=(flush_interval,), daemon=True)
+      self._flusher.start()
+
+  def _admit(self, log_level, message):
+    key = self.template_key(message)
+    now = self.clock()
+    records = []
+    with self.lock:
+      bucket = self.buckets.get(key)
+      if bucket is None:
+        bucket = self.buckets[key] = [self.burst, now, 0, None]
+        if len(self.buckets) > self.max_templates:
+          evicted = self.buckets.popitem(last=False)[1]
+          if evicted[2]:
+            records.append(_suppressed_summary(*evicted[3], evicted[2]))
+      else:
+        self.buckets.move_to_end(key)
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+      if bucket[0] < 1:
+        bucket[2] += 1
+        bucket[3] = (log_level, message)
+        return records
+      bucket[0] -= 1
+      suppressed, bucket[2] = bucket[2], 0
+    if suppressed:
+      log_level, message = _suppressed_summary(log_level, message, suppressed)
+    records.append((log_level, message))
+    return records
+
+  def flush(self):
+    with self.lock:
+      summaries = []
+      for bucket in self.buckets.values():
+        if bucket[2]:
+          summaries.append(_suppressed_summary(*bucket[3], bucket[2]))
+          bucket[2] = 0
+    self._pass_on(summaries)
+    super().flush()
+
+  def _flush_periodically(self, interval):
+    while not self._closed.wait(interval):
+      self.flush()
+
+  def close(self):
+    self._closed.set()
+    if self._flusher is not None:
+      self._flusher.join()
+    self.flush()
+
+class DedupLogger(FilterProcessor):
+  """
+  Passes on the first occurrence of each (level, message) and swallows repeats for
+  `interval` seconds, then reports them as one "(repeated N times)" record. Windows close
+  in the order they opened, so each log call only inspects windows that are already due;
+  flush() reports every open window immediately.
+
+  Due windows are otherwise only closed by the next log() call, so a logger that goes quiet
+  keeps its last burst. Pass flush_interval to close due windows on a timer, or call
+  flush() (or close()) before shutting down.
+  """
+
+  def __init__(self, next_log_processor, interval=10.0, max_entries=10000, clock=time.monotonic,
+               flush_interval=None):
+    super().__init__(next_log_processor)
+    self.interval = interval
+    self.max_entries = max_entries
+    self.clock = clock
+    self.windows = OrderedDict()  # (level, message) -> [window start, repeats]
+    self.lock = Lock()
+    self._closed = Event()
+    self._flusher = None
+    if flush_interval:
+      self._flusher = Thread(target=self._close_due_periodically, args=(flush_interval,), daemon=True)
+      self._flusher.start()
+
+  def _admit(self, log_level, message):
+    now = self.clock()
+    key = (log_level, message)
+    with self.lock:
+      summaries = self._close_windows(now)
+      window = self.windows.get(key)
+      if window is not None:
+        window[1] += 1
+      else:
+        self.windows[key] = [now, 0]
+        if len(self.windows) > self.max_entries:
+          summaries.append(self._summary(*self.windows.popitem(last=False)))
+        summaries.append(key)
+    return [record for record in summaries if record is not None]
+
+  def _close_windows(self, now):
+    # Caller holds self.lock.
+    summaries = []
+    windows = self.windows
+    while windows:
+      key, window = next(iter(windows.items()))
+      if now - window[0] < self.interval:
+        break
+      del windows[key]
+      summaries.append(self._summary(key, window))
+    return summaries
+
+  @staticmethod
+  def _summary(key, window):
+    log_level, message = key
+    if not window[1]:
+      return None
+    return log_level, f"{message} (repeated {window[1]} times)"
+
+  def flush(self):
+    with self.lock:
+      summaries = [self._summary(key, window) for key, window in self.windows.items()]
+      self.windows.clear()
+    self._emit(summaries)
+    super().flush()
+
+  def _emit(self, summaries):
+    self._pass_on([summary for summary in summaries if summary is not None])
+
+  def _close_due_periodically(self, interval):
+    while not self._closed.wait(interval):
+      with self.lock:
+        summaries = self._close_windows(self.clock())
+      self._emit(summaries)
+
+  def close(self):
+    self._closed.set()
+    if self._flusher is not None:
+      self._flusher.join()
+    self.flush()
+
+class AsyncLogger(LogProcessor):
+  """
+  Front of a chain that only enqueues records on the caller's thread. A background writer
+  takes up to batch_size records at a time, formats them through the rest of the chain and
+  writes each batch to `stream` with a single write call.
+
+  When max_queue records are waiting, overflow="block" makes producers wait for the writer
+  (backpressure) and overflow="drop" discards the record and counts it in `dropped`.
+
+  Filters (sampling, rate limiting, dedup) at the front of the chain run on the caller's
+  thread as each record is logged, so sampling still sees the real call site; only what they
+  pass on, and the summaries they release later, is enqueued and formatted by the processors
+  after them. close() closes those filters first so their held-back summaries are written.
+
+  A batch whose formatting or write raises is counted in `failed_batches` (the exception is
+  kept in `last_error`) and the writer carries on. Should the writer thread still stop,
+  log() and flush() raise RuntimeError instead of waiting for it forever.
+  """
+
+  OVERFLOW_POLICIES = ("block", "drop")
+
+  def __init__(self, next_log_processor, stream=None, batch_size=512, flush_interval=0.05,
+               max_queue=65536, overflow="block"):
+    super().__init__(next_log_processor)
+    if overflow not in self.OVERFLOW_POLICIES:
+      raise ValueError(f"overflow must be one of {self.OVERFLOW_POLICIES}")
+    self.stream = stream if stream is not None else sys.stdout
+    self.batch_size = batch_size
+    self.flush_interval = flush_interval
+    self.max_queue = max_queue
+    self.overflow = overflow
+    self.records = deque()
+    self.dropped = 0
+    self.batches_written = 0
+    self.failed_batches = 0
+    self.last_error = None
+    self.lock = Lock()
+    self.not_empty = Condition(self.lock)
+    self.not_full = Condition(self.lock)
+    self.idle = Condition(self.lock)
+    self._writing = False
+    self._closed = False
+    self._writer_alive = True
+    self.filters = []
+    self.formatter = next_log_processor  # first processor after the filters
+    while isinstance(self.formatter, FilterProcessor):
+      self.filters.append(self.formatter)
+      self.formatter = self.formatter.next_log_processor
+    if self.filters:
+      self.filters[-1].emit = self._enqueue
+    self._writer = Thread(target=self._run_writer, daemon=True)
+    self._writer.start()
+
+  def _check_writer(self):
+    # Caller holds self.lock.
+    if not self._writer_alive:
+      raise RuntimeError(f"AsyncLogger writer thread has stopped: {self.last_error!r}")
+
+  def log(self, log_level, message):
+    if self._closed:
+      raise ValueError("log on a closed AsyncLogger")
+    if self.filters:
+      self.filters[0].log(log_level, message)
     else:
-      super().log(log_level, message)
+      self._enqueue(log_level, message)
+
+  def _enqueue(self, log_level, message):
+    with self.lock:
+      if self._closed:
+        self.dropped += 1  # a filter's timer released a summary after close()
+        return
+      self._check_writer()
+      if len(self.records) >= self.max_queue:
+        if self.overflow == "drop":
+          self.dropped += 1
+          return
+        while len(self.records) >= self.max_queue:
+          self.not_empty.notify()
+          self.not_full.wait()
+          self._check_writer()
+      self.records.append((log_level, message))
+      if len(self.records) == self.batch_size:
+        self.not_empty.notify()
+
+  def format(self, log_level, message):
+    # The writer thread calls this for each queued record; filters have already run.
+    if self.formatter is None:
+      return None
+    return self.formatter.format(log_level, message)
+
+  def _run_writer(self):
+    try:
+      self._write_batches()
+    except BaseException as error:
+      self.last_error = error
+      raise
+    finally:
+      with self.lock:
+        self._writer_alive = False
+        self.not_full.notify_all()
+        self.idle.notify_all()
+
+  def _write_batches(self):
+    records = self.records
+    while True:
+      with self.lock:
+        if len(records) < self.batch_size and not self._closed:
+          self.not_empty.wait(self.flush_interval)
+        if not records:
+          if self._closed:
+            return
+          continue
+        batch = [records.popleft() for _ in range(min(len(records), self.batch_size))]
+        self._writing = True
+        self.not_full.notify_all()
+      try:
+        self._write(batch)
+      except Exception as error:
+        self.failed_batches += 1
+        self.last_error = error
+      with self.lock:
+        self._writing = False
+        self.idle.notify_all()
+
+  def _write(self, batch):
+    lines = []
+    for log_level, message in batch:
+      line = self.format(log_level, message)
+      if line is not None:
+        lines.append(line)
+    if lines:
+      lines.append("")
+      self.stream.write("\n".join(lines))
+      self.stream.flush()
+      self.batches_written += 1
+
+  def flush(self):
+    """
+    Releases what the filters are holding back, then blocks until every record enqueued so
+    far has been written.
+    """
+    if self.filters:
+      self.filters[0].flush()
+    with self.lock:
+      while self.records or self._writing:
+        self._check_writer()
+        self.not_empty.notify()
+        self.idle.wait()
+
+  def close(self):
+    for processor in self.filters:
+      processor.close()
+    with self.lock:
+      self._closed = True
+      self.not_empty.notify()
+      self.not_full.notify_all()
+    self._writer.join()
+
+
+if __name__ == "__main__":
+  logger = InfoLogger(ErrorLogger(DebugLogger(None)))
+
+  logger.log(LoggerLevel.SYSTEM, "Api latency: 5ms")
+
+  dispatcher = LevelDispatcher(InfoLogger(ErrorLogger(DebugLogger(None))))
+  dispatcher.log(LoggerLevel.DEBUG, "cache warmed")
+  for log_level in LoggerLevel:
+    print(f"{log_level.name} enabled: {dispatcher.is_enabled(log_level)}")
 
+  print("\nIncident flood of 10,000 identical errors:")
+  deduplicated = DedupLogger(RateLimitedLogger(InfoLogger(ErrorLogger(DebugLogger(None))), rate=1, burst=3))
+  for i in range(10_000):
+    deduplicated.log(LoggerLevel.ERROR, "db connection refused")
+    deduplicated.log(LoggerLevel.ERROR, f"request {i} failed after 30ms")
+  deduplicated.flush()
 
-logger = InfoLogger(ErrorLogger(DebugLogger(None)))
+  sampled = SamplingLogger(InfoLogger(None), every=1000, burst=2)
+  for i in range(3000):
+    sampled.log(LoggerLevel.INFO, f"cache miss {i}")
+  print(f"Sampling dropped {sampled.sampled_out} of 3000 records from one call site\n")
 
-logger.log(LoggerLevel.SYSTEM, "Api latency: 5ms")
\ No newline at end of file
+  async_logger = AsyncLogger(InfoLogger(ErrorLogger(DebugLogger(None))), batch_size=4)
+  for i in range(10):
+    async_logger.log(LoggerLevel.INFO if i % 2 else LoggerLevel.ERROR, f"request {i} served")
+  async_logger.close()
+  print(f"Async logger wrote 10 records in {async_logger.batches_written} batches")
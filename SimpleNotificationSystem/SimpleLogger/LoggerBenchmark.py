@@ -0,0 +1,109 @@
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from BinaryLogSink import BinaryLogSink
+from Logger import AsyncLogger, DebugLogger, ErrorLogger, InfoLogger, LevelDispatcher, LoggerLevel
+
+
+def build_chain():
+  return InfoLogger(ErrorLogger(DebugLogger(None)))
+
+
+def percentile(sorted_values, fraction):
+  return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+# --- Caller-side latency ---
+def bench_caller_latency(logger, num_messages):
+  """
+  Times every log call on the producer thread and returns (sorted latencies in ns, wall seconds).
+  """
+  levels = (LoggerLevel.INFO, LoggerLevel.ERROR, LoggerLevel.DEBUG)
+  latencies = []
+  clock = time.perf_counter_ns
+  started = clock()
+  for i in range(num_messages):
+    before = clock()
+    logger.log(levels[i % 3], "request served in 5ms")
+    latencies.append(clock() - before)
+  elapsed = (clock() - started) / 1e9
+  latencies.sort()
+  return latencies, elapsed
+
+
+# --- Level dispatch cost ---
+def bench_dispatch(logger, log_level, num_messages):
+  """
+  Returns nanoseconds per format() call, i.e. the routing cost without any I/O.
+  """
+  format_record = logger.format
+  started = time.perf_counter_ns()
+  for _ in range(num_messages):
+    format_record(log_level, "request served in 5ms")
+  return (time.perf_counter_ns() - started) / num_messages
+
+
+# --- Sink throughput ---
+def bench_throughput(log_call, num_messages):
+  """
+  Returns records per second for log_call(i).
+  """
+  started = time.perf_counter()
+  for i in range(num_messages):
+    log_call(i)
+  return num_messages / (time.perf_counter() - started)
+
+
+def report(name, latencies, elapsed, extra=""):
+  print(f"  {name:<22} p50={percentile(latencies, 0.5):>7,}ns p99={percentile(latencies, 0.99):>9,}ns "
+        f"max={latencies[-1]:>11,}ns {len(latencies) / elapsed:>12,.0f} msg/s {extra}")
+
+
+if __name__ == "__main__":
+  num_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+  # Write to a real file so the comparison measures logging, not the terminal.
+  with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "bench.log")
+    print(f"Caller-side latency over {num_messages:,} messages (written to a file)")
+
+    with open(path, "w") as stream, redirect_stdout(stream):
+      latencies, elapsed = bench_caller_latency(build_chain(), num_messages)
+    report("synchronous chain", latencies, elapsed)
+
+    for overflow in AsyncLogger.OVERFLOW_POLICIES:
+      with open(path, "w") as stream:
+        logger = AsyncLogger(build_chain(), stream=stream, max_queue=16_384, overflow=overflow)
+        latencies, elapsed = bench_caller_latency(logger, num_messages)
+        started = time.perf_counter()
+        logger.close()
+        drain = time.perf_counter() - started
+      report(f"async ({overflow})", latencies, elapsed,
+             f"batches={logger.batches_written} dropped={logger.dropped} drain={drain:.2f}s")
+
+  print("\nRouting cost per record (format only, no I/O)")
+  chain, dispatcher = build_chain(), LevelDispatcher(build_chain())
+  for log_level in LoggerLevel:
+    print(f"  {log_level.name:<7} chain={bench_dispatch(chain, log_level, num_messages):>6.0f}ns "
+          f"dispatcher={bench_dispatch(dispatcher, log_level, num_messages):>6.0f}ns "
+          f"is_enabled={dispatcher.is_enabled(log_level)}")
+
+  print("\nSink throughput")
+  with tempfile.TemporaryDirectory() as directory:
+    text_path = os.path.join(directory, "bench.log")
+    with open(text_path, "w") as stream, redirect_stdout(stream):
+      chain = build_chain()
+      text_rate = bench_throughput(lambda i: chain.log(LoggerLevel.INFO, f"request {i} served in {i * 0.5:.1f}ms"),
+                                   num_messages)
+    text_bytes = os.path.getsize(text_path)
+    print(f"  print chain, formatted on the caller : {text_rate:>10,.0f} records/s "
+          f"{text_bytes / num_messages:>5.1f} bytes/record")
+    sink = BinaryLogSink(directory=os.path.join(directory, "binary"), segment_size=16 * 1024 * 1024)
+    binary_rate = bench_throughput(
+      lambda i: sink.record(LoggerLevel.INFO, "request {} served in {:.1f}ms", i, i * 0.5), num_messages)
+    binary_bytes = sink.sequence * sink.segment_size + sink.offset
+    sink.close()
+    print(f"  binary sink, formatting deferred     : {binary_rate:>10,.0f} records/s "
+          f"{binary_bytes / num_messages:>5.1f} bytes/record")
@@ -0,0 +1,36 @@
+import io
+import tempfile
+import unittest
+
+from BinaryLogSink import BinaryLogSink, read_records
+from Logger import AsyncLogger, InfoLogger, LevelDispatcher, LoggerLevel
+
+
+class BinaryLogSinkFormatPathTest(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp(prefix="binary-log-test-")
+    self.sink = BinaryLogSink(directory=self.directory, segment_size=64 * 1024, num_segments=2)
+
+  def recorded(self):
+    self.sink.close()
+    return [(log_level, args[0]) for _, log_level, _, args in read_records(self.directory)]
+
+  def test_behind_async_logger(self):
+    stream = io.StringIO()
+    async_logger = AsyncLogger(self.sink, stream=stream, batch_size=4)
+    for i in range(10):
+      async_logger.log(LoggerLevel.ERROR, f"request {i} failed")
+    async_logger.close()
+    self.assertEqual(self.recorded(), [(LoggerLevel.ERROR, f"request {i} failed") for i in range(10)])
+    self.assertEqual(stream.getvalue(), "")
+
+  def test_behind_level_dispatcher(self):
+    dispatcher = LevelDispatcher(InfoLogger(self.sink))
+    self.assertEqual(dispatcher.format(LoggerLevel.INFO, "cache warmed"), "INFO: cache warmed")
+    self.assertIsNone(dispatcher.format(LoggerLevel.ERROR, "disk full"))
+    self.assertEqual(self.recorded(), [(LoggerLevel.ERROR, "disk full")])
+
+
+if __name__ == "__main__":
+  unittest.main()
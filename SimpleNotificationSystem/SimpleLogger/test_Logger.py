@@ -0,0 +1,67 @@
+import io
+import unittest
+
+from Logger import (AsyncLogger, DebugLogger, DedupLogger, ErrorLogger, InfoLogger, LevelDispatcher,
+                    LoggerLevel, RateLimitedLogger, SamplingLogger)
+
+
+def chain():
+  return InfoLogger(ErrorLogger(DebugLogger(None)))
+
+
+def written_lines(processor, records):
+  # Logs (level, message) records through an AsyncLogger in front of processor.
+  stream = io.StringIO()
+  async_logger = AsyncLogger(processor, stream=stream, batch_size=8)
+  for log_level, message in records:
+    async_logger.log(log_level, message)
+  async_logger.close()
+  return stream.getvalue().splitlines()
+
+
+class FiltersBehindAsyncLoggerTest(unittest.TestCase):
+
+  def test_dedup(self):
+    lines = written_lines(DedupLogger(chain()), [(LoggerLevel.ERROR, "db connection refused")] * 1000)
+    self.assertEqual(lines, ["ERROR: db connection refused",
+                             "ERROR: db connection refused (repeated 999 times)"])
+
+  def test_rate_limited(self):
+    limited = RateLimitedLogger(chain(), rate=1, burst=3, clock=lambda: 0.0)
+    lines = written_lines(limited, [(LoggerLevel.ERROR, f"request {i} failed") for i in range(100)])
+    self.assertEqual(lines, ["ERROR: request 0 failed", "ERROR: request 1 failed", "ERROR: request 2 failed",
+                             "ERROR: request 99 failed [rate limited: 97 similar messages suppressed]"])
+
+  def test_sampling_keys_on_the_caller(self):
+    sampled = SamplingLogger(chain(), every=10, burst=2)
+    stream = io.StringIO()
+    async_logger = AsyncLogger(sampled, stream=stream)
+    for i in range(100):
+      async_logger.log(LoggerLevel.INFO, f"hit {i}")
+      async_logger.log(LoggerLevel.INFO, f"miss {i}")
+    async_logger.close()
+    lines = stream.getvalue().splitlines()
+    # Each call site passes its first two records and every tenth after that.
+    self.assertEqual(sum(line.startswith("INFO: hit") for line in lines), 12)
+    self.assertEqual(sum(line.startswith("INFO: miss") for line in lines), 12)
+    self.assertEqual(sampled.sampled_out, 176)
+
+  def test_stacked_filters(self):
+    filters = DedupLogger(RateLimitedLogger(chain(), rate=1, burst=1, clock=lambda: 0.0))
+    lines = written_lines(filters, [(LoggerLevel.ERROR, "request 1 failed"), (LoggerLevel.ERROR, "request 1 failed"),
+                                    (LoggerLevel.ERROR, "request 2 failed")])
+    # close() releases the dedup summary through the rate limiter, then the rate limiter's own.
+    self.assertEqual(lines, ["ERROR: request 1 failed", "ERROR: request 1 failed (repeated 1 times)",
+                             "ERROR: request 2 failed [rate limited: 1 similar messages suppressed]"])
+
+
+class FiltersInFormatPathTest(unittest.TestCase):
+
+  def test_dispatcher_formats_through_dedup(self):
+    dispatcher = LevelDispatcher(DedupLogger(chain()))
+    lines = [dispatcher.format(LoggerLevel.ERROR, "db connection refused") for _ in range(3)]
+    self.assertEqual(lines, ["ERROR: db connection refused", None, None])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -194,69 +194,68 @@ class StackOverflow:
     user.comment_on(commentable, content)
 
 
-system = StackOverflow()
+if __name__ == "__main__":
+  system = StackOverflow()
 
-alice = system.create_user("Alice", "alice@example.com")
-bob = system.create_user("Bob", "bob@example.com")
-charlie = system.create_user("Charlie", "charlie@example.com")
+  alice = system.create_user("Alice", "alice@example.com")
+  bob = system.create_user("Bob", "bob@example.com")
+  charlie = system.create_user("Charlie", "charlie@example.com")
 
-java_question = system.ask_question(alice, "What is inheritence in Java?", "Please give example", ["java", "oop"])
-bob_answer = system.answer_question(bob, java_question, "Its a technique to reduce redundancy in code")
-system.add_comment(charlie, java_question, "Great question. I want to know as well")
-system.add_comment(alice, bob_answer, "Thanks for the explanation! Could you provide a code example?")
+  java_question = system.ask_question(alice, "What is inheritence in Java?", "Please give example", ["java", "oop"])
+  bob_answer = system.answer_question(bob, java_question, "Its a technique to reduce redundancy in code")
+  system.add_comment(charlie, java_question, "Great question. I want to know as well")
+  system.add_comment(alice, bob_answer, "Thanks for the explanation! Could you provide a code example?")
 
-# Charlie votes on the question and answer
-system.vote_question(charlie, java_question, 1)  # Upvote
-system.vote_answer(charlie, bob_answer, 1)  # Upvote
+  # Charlie votes on the question and answer
+  system.vote_question(charlie, java_question, 1)  # Upvote
+  system.vote_answer(charlie, bob_answer, 1)  # Upvote
 
-# Alice accepts Bob's answer
-system.accept_answer(bob_answer)
+  # Alice accepts Bob's answer
+  system.accept_answer(bob_answer)
 
-# Bob asks another question
-python_question = system.ask_question(bob, "How to use list comprehensions in Python?",
-                                    "I'm new to Python and I've heard about list comprehensions. Can someone explain how to use them?",
-                                    ["python", "list-comprehension"])
+  # Bob asks another question
+  python_question = system.ask_question(bob, "How to use list comprehensions in Python?",
+                                      "I'm new to Python and I've heard about list comprehensions. Can someone explain how to use them?",
+                                      ["python", "list-comprehension"])
 
-# Alice answers Bob's question
-alice_answer = system.answer_question(alice, python_question,
-                                    "List comprehensions in Python provide a concise way to create lists...")
+  # Alice answers Bob's question
+  alice_answer = system.answer_question(alice, python_question,
+                                      "List comprehensions in Python provide a concise way to create lists...")
 
-# Charlie votes on Bob's question and Alice's answer
-system.vote_question(charlie, python_question, 1)  # Upvote
-system.vote_answer(charlie, alice_answer, 1)  # Upvote
+  # Charlie votes on Bob's question and Alice's answer
+  system.vote_question(charlie, python_question, 1)  # Upvote
+  system.vote_answer(charlie, alice_answer, 1)  # Upvote
 
-# Print out the current state
-print(f"Question: {java_question.title}")
-print(f"Asked by: {java_question.author.username}")
-print(f"Tags: {', '.join(tag.name for tag in java_question.tags)}")
-print(f"Votes: {java_question.get_vote_count()}")
-print(f"Comments: {len(java_question.get_comments())}")
-print(f"\nAnswer by {bob_answer.author.username}:")
-print(bob_answer.content)
-print(f"Votes: {bob_answer.get_vote_count()}")
-print(f"Accepted: {bob_answer.is_accepted}")
-print(f"Comments: {len(bob_answer.get_comments())}")
+  # Print out the current state
+  print(f"Question: {java_question.title}")
+  print(f"Asked by: {java_question.author.username}")
+  print(f"Tags: {', '.join(tag.name for tag in java_question.tags)}")
+  print(f"Votes: {java_question.get_vote_count()}")
+  print(f"Comments: {len(java_question.get_comments())}")
+  print(f"\nAnswer by {bob_answer.author.username}:")
+  print(bob_answer.content)
+  print(f"Votes: {bob_answer.get_vote_count()}")
+  print(f"Accepted: {bob_answer.is_accepted}")
+  print(f"Comments: {len(bob_answer.get_comments())}")
 
-print("\nUser Reputations:")
-print(f"Alice: {alice.reputation}")
-print(f"Bob: {bob.reputation}")
-print(f"Charlie: {charlie.reputation}")
+  print("\nUser Reputations:")
+  print(f"Alice: {alice.reputation}")
+  print(f"Bob: {bob.reputation}")
+  print(f"Charlie: {charlie.reputation}")
 
-# Demonstrate search functionality
-print("\nSearch Results for 'java':")
-search_results = system.search_questions("java")
-for q in search_results:
-    print(q.title)
+  # Demonstrate search functionality
+  print("\nSearch Results for 'java':")
+  search_results = system.search_questions("java")
+  for q in search_results:
+      print(q.title)
 
-print("\nSearch Results for 'python':")
-search_results = system.search_questions("python")
-for q in search_results:
-    print(q.title)
+  print("\nSearch Results for 'python':")
+  search_results = system.search_questions("python")
+  for q in search_results:
+      print(q.title)
 
-# Demonstrate getting questions by user
-print("\nBob's Questions:")
-bob_questions = system.get_questions_by_users(bob)
-for q in bob_questions:
-    print(q.title)
-
-    
\ No newline at end of file
+  # Demonstrate getting questions by user
+  print("\nBob's Questions:")
+  bob_questions = system.get_questions_by_users(bob)
+  for q in bob_questions:
+      print(q.title)
@@ -0,0 +1,175 @@
+import argparse
+import random
+import time
+from itertools import accumulate
+from threading import Lock, Thread
+
+from SwitchableCache import (
+    ARCEvictionStrategy,
+    Cache,
+    CacheStats,
+    ConcurrentCache,
+    LFUEvictionStrategy,
+    LRUTTLEvictionStrategy,
+    WTinyLFUEvictionStrategy,
+)
+
+
+class GloballyLockedCache:
+    # The only thread-safe way to share the plain Cache: one lock around every call.
+    def __init__(self, cache):
+        self.cache = cache
+        self.lock = Lock()
+
+    def put(self, key, value, ttl = None):
+        with self.lock:
+            self.cache.put(key, value, ttl)
+
+    def get(self, key):
+        with self.lock:
+            return self.cache.get(key)
+
+
+# --- get/put throughput from many threads ---
+def bench_threads(cache, num_threads: int, ops_per_thread: int, num_keys: int) -> float:
+    """
+    Runs a 90% get / 10% put mix from num_threads threads and returns aggregate ops/sec.
+    """
+    def worker(seed):
+        get, put = cache.get, cache.put
+        for i in range(ops_per_thread):
+            key = (seed + i * 7919) % num_keys
+            if i % 10 == 0:
+                put(key, i)
+            else:
+                get(key)
+
+    threads = [Thread(target=worker, args=(t * 104729,)) for t in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return num_threads * ops_per_thread / (time.perf_counter() - start)
+
+
+# --- Trace replay: hit ratio and ops/sec per strategy ---
+STRATEGIES = {
+    "LRU": lambda capacity: LRUTTLEvictionStrategy(max_size=capacity),
+    "LFU": LFUEvictionStrategy,
+    "ARC": ARCEvictionStrategy,
+    "W-TinyLFU": WTinyLFUEvictionStrategy,
+}
+
+
+def load_trace(path):
+    """
+    Reads a recorded key trace: one key per line (only the first whitespace-separated field is used).
+    """
+    with open(path) as trace_file:
+        return [line.split()[0] for line in trace_file if line.strip()]
+
+
+def zipf_trace(length: int, num_keys: int, skew: float = 1.0, seed: int = 7):
+    cum_weights = list(accumulate(1 / (rank ** skew) for rank in range(1, num_keys + 1)))
+    return random.Random(seed).choices(range(num_keys), cum_weights=cum_weights, k=length)
+
+
+def scan_trace(length: int, num_keys: int, scan_length: int, seed: int = 7):
+    """
+    A Zipf-distributed working set interrupted by long one-off sequential scans.
+    """
+    hot = zipf_trace(length, num_keys, seed=seed)
+    trace, scan_start = [], num_keys
+    for i, key in enumerate(hot):
+        trace.append(key)
+        if i % (4 * scan_length) == 0:
+            trace.extend(range(scan_start, scan_start + scan_length))
+            scan_start += scan_length
+    return trace[:length]
+
+
+def replay(strategy, trace):
+    """
+    Replays a trace as read-through traffic (get, then put on a miss) and returns
+    (hit ratio, ops/sec).
+    """
+    cache = Cache(strategy)
+    get, put = cache.get, cache.put
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        if get(key) == -1:
+            put(key, key)
+        else:
+            hits += 1
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), len(trace) / elapsed
+
+
+def bench_instrumentation(num_ops: int):
+    """
+    Returns get ops/sec on a warm cache with stats disabled, enabled, and enabled with a
+    1-in-1000 sampling hook.
+    """
+    variants = {
+        "stats off": None,
+        "stats on": CacheStats(),
+        "stats + sampler": CacheStats(sample_every=1000, sampler=lambda event, key, detail: None),
+    }
+    results = {}
+    for name, recorder in variants.items():
+        cache = Cache(LRUTTLEvictionStrategy(max_size=1000), stats=recorder)
+        for key in range(1000):
+            cache.put(key, key)
+        get = cache.get
+        start = time.perf_counter()
+        for i in range(num_ops):
+            get(i % 1000)
+        results[name] = num_ops / (time.perf_counter() - start)
+    return results
+
+
+def run_thread_benchmark(total_ops):
+    num_keys = 100_000
+    capacity = 50_000
+
+    print(f"get/put throughput ({total_ops:,} ops, 90% reads, {num_keys:,} keys, capacity {capacity:,})")
+    for num_threads in (1, 2, 4, 8, 16, 32):
+        locked = GloballyLockedCache(Cache(LRUTTLEvictionStrategy(max_size=capacity)))
+        segmented = ConcurrentCache(lambda: LRUTTLEvictionStrategy(max_size=capacity // 16), num_segments=16)
+        ops = total_ops // num_threads
+        locked_rate = bench_threads(locked, num_threads, ops, num_keys)
+        segmented_rate = bench_threads(segmented, num_threads, ops, num_keys)
+        print(f"  threads={num_threads:>2}: Cache+global lock {locked_rate:>10,.0f} ops/s   "
+              f"ConcurrentCache {segmented_rate:>10,.0f} ops/s")
+
+
+def run_trace_benchmark(traces, capacity):
+    for name, trace in traces.items():
+        print(f"\nTrace replay: {name} ({len(trace):,} accesses, capacity {capacity:,})")
+        for strategy_name, factory in STRATEGIES.items():
+            hit_ratio, rate = replay(factory(capacity), trace)
+            print(f"  {strategy_name:<10}: hit ratio {hit_ratio:6.2%}  {rate:>10,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SwitchableCache benchmarks")
+    parser.add_argument("--ops", type=int, default=1_000_000, help="operations for the threaded benchmark")
+    parser.add_argument("--trace", action="append", default=[], help="recorded key trace file (repeatable)")
+    parser.add_argument("--capacity", type=int, default=10_000, help="cache capacity for trace replay")
+    parser.add_argument("--length", type=int, default=500_000, help="length of the synthetic traces")
+    args = parser.parse_args()
+
+    run_thread_benchmark(args.ops)
+    print("\nInstrumentation overhead (warm get)")
+    for name, rate in bench_instrumentation(args.ops).items():
+        print(f"  {name:<16}: {rate:>10,.0f} ops/s")
+    if args.trace:
+        traces = {path: load_trace(path) for path in args.trace}
+    else:
+        traces = {
+            "zipf": zipf_trace(args.length, 100_000),
+            "zipf + scans": scan_trace(args.length, 100_000, scan_length=args.capacity * 2),
+        }
+    run_trace_benchmark(traces, args.capacity)
@@ -0,0 +1,301 @@
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Event, Lock, Thread
+
+from SwitchableCache import Cache, CacheStats, LRUTTLEvictionStrategy
+
+
+class LoadingCache:
+    """
+    Read-through / write-behind wrapper around a Cache for threaded callers.
+
+    get(key, loader) returns the cached value or loads it; concurrent misses on the same key
+    share a single loader call. Once an entry is older than refresh_ahead * ttl it is still
+    served, but a background reload replaces it before it expires. put() updates the cache
+    immediately and queues the write; queued writes are coalesced per key and handed to
+    `writer` as one dict per batch, when write_batch_size is reached or every write_interval
+    seconds. A batch the writer rejects is queued again (behind any newer write of the same
+    key) and retried with the next one.
+    """
+
+    def __init__(self, cache, ttl = None, refresh_ahead = 0.8, writer = None,
+                 write_batch_size = 100, write_interval = 1.0, refresh_workers = 4,
+                 clock = time.monotonic):
+        self.cache = cache
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.writer = writer
+        self.write_batch_size = write_batch_size
+        self.clock = clock
+        self.lock = Lock()  # guards the cache, in-flight loads and pending writes
+        self.in_flight = {}  # key -> Future of the load currently running
+        self.superseded = {}  # key -> value put() while its load was running; wins over the load
+        self.pending_writes = {}
+        self.failed_writes = 0  # batches the writer raised on
+        self.refresher = ThreadPoolExecutor(max_workers=refresh_workers)
+        self._closed = Event()
+        self._flusher = None
+        if writer is not None:
+            self._flusher = Thread(target=self._flush_periodically, args=(write_interval,), daemon=True)
+            self._flusher.start()
+
+    def get(self, key, loader):
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry != -1:
+                value, refresh_at = entry
+                if refresh_at is not None and self.clock() >= refresh_at and key not in self.in_flight:
+                    self._start_load(key, loader, background=True)
+                return value
+            future = self.in_flight.get(key)
+            if future is None:
+                future = self._start_load(key, loader, background=False)
+                owner = True
+            else:
+                owner = False
+        if owner:
+            self._load(key, loader, future)
+        return future.result()
+
+    def _start_load(self, key, loader, background):
+        # Caller holds self.lock.
+        future = Future()
+        self.in_flight[key] = future
+        if background:
+            self.refresher.submit(self._load, key, loader, future)
+        return future
+
+    def _load(self, key, loader, future):
+        recorder = getattr(self.cache, "stats_recorder", None)
+        started = time.perf_counter()
+        try:
+            value = loader(key)
+        except BaseException as error:
+            if recorder is not None:
+                recorder.record_load(key, time.perf_counter() - started, success=False)
+            with self.lock:
+                del self.in_flight[key]
+                self.superseded.pop(key, None)
+            future.set_exception(error)
+            return
+        if recorder is not None:
+            recorder.record_load(key, time.perf_counter() - started)
+        with self.lock:
+            if key in self.superseded:
+                value = self.superseded.pop(key)  # already stored by put()
+            else:
+                self._store(key, value)
+            del self.in_flight[key]
+        future.set_result(value)
+
+    def _store(self, key, value):
+        # Caller holds self.lock.
+        refresh_at = self.clock() + self.ttl * self.refresh_ahead if self.ttl else None
+        self.cache.put(key, (value, refresh_at), self.ttl)
+
+    def put(self, key, value):
+        with self.lock:
+            self._store(key, value)
+            if key in self.in_flight:
+                self.superseded[key] = value
+            if self.writer is None:
+                return
+            self.pending_writes[key] = value
+            if len(self.pending_writes) < self.write_batch_size:
+                return
+            batch, self.pending_writes = self.pending_writes, {}
+        self._write(batch)
+
+    def flush(self):
+        with self.lock:
+            batch, self.pending_writes = self.pending_writes, {}
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            self.writer(batch)
+        except BaseException:
+            with self.lock:
+                self.failed_writes += 1
+                # Writes queued since the batch was detached are newer and take precedence.
+                batch.update(self.pending_writes)
+                self.pending_writes = batch
+            raise
+
+    def _flush_periodically(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                pass  # the batch is queued again and retried on the next tick
+
+    def close(self):
+        """
+        Stops background work and flushes any queued writes.
+        """
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self.flush()
+        self.refresher.shutdown(wait=True)
+
+
+class AsyncLoadingCache:
+    """
+    asyncio counterpart of LoadingCache: `loader` and `writer` are coroutine functions, misses
+    are coalesced onto one task per key, refresh-ahead runs as a background task and
+    write-behind batches are flushed by a single periodic task. As in LoadingCache, a batch
+    the writer rejects is queued again and counted in failed_writes. Use from one event loop.
+    """
+
+    def __init__(self, cache, ttl = None, refresh_ahead = 0.8, writer = None,
+                 write_batch_size = 100, write_interval = 1.0, clock = time.monotonic):
+        self.cache = cache
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.writer = writer
+        self.write_batch_size = write_batch_size
+        self.write_interval = write_interval
+        self.clock = clock
+        self.in_flight = {}  # key -> Task of the load currently running
+        self.superseded = {}  # key -> value put() while its load was running; wins over the load
+        self.pending_writes = {}
+        self.failed_writes = 0  # batches the writer raised on
+        self._flusher = None
+
+    async def get(self, key, loader):
+        entry = self.cache.get(key)
+        if entry != -1:
+            value, refresh_at = entry
+            if refresh_at is not None and self.clock() >= refresh_at and key not in self.in_flight:
+                self._start_load(key, loader)
+            return value
+        task = self.in_flight.get(key)
+        if task is None:
+            task = self._start_load(key, loader)
+        # shield: one cancelled caller must not cancel the load the others are waiting on.
+        return await asyncio.shield(task)
+
+    def _start_load(self, key, loader):
+        task = asyncio.ensure_future(self._load(key, loader))
+        self.in_flight[key] = task
+        return task
+
+    async def _load(self, key, loader):
+        recorder = getattr(self.cache, "stats_recorder", None)
+        started = time.perf_counter()
+        success = False
+        try:
+            value = await loader(key)
+            success = True
+            if key in self.superseded:
+                return self.superseded.pop(key)  # already stored by put()
+            self._store(key, value)
+            return value
+        finally:
+            if recorder is not None:
+                recorder.record_load(key, time.perf_counter() - started, success)
+            del self.in_flight[key]
+            self.superseded.pop(key, None)
+
+    def _store(self, key, value):
+        refresh_at = self.clock() + self.ttl * self.refresh_ahead if self.ttl else None
+        self.cache.put(key, (value, refresh_at), self.ttl)
+
+    async def put(self, key, value):
+        self._store(key, value)
+        if key in self.in_flight:
+            self.superseded[key] = value
+        if self.writer is None:
+            return
+        if self._flusher is None:
+            self._flusher = asyncio.ensure_future(self._flush_periodically())
+        self.pending_writes[key] = value
+        if len(self.pending_writes) >= self.write_batch_size:
+            await self.flush()
+
+    async def flush(self):
+        batch, self.pending_writes = self.pending_writes, {}
+        if not batch:
+            return
+        try:
+            await self.writer(batch)
+        except BaseException:
+            self.failed_writes += 1
+            # Writes queued while the writer ran are newer and take precedence.
+            batch.update(self.pending_writes)
+            self.pending_writes = batch
+            raise
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.write_interval)
+            try:
+                await self.flush()
+            except Exception:
+                pass  # the batch is queued again and retried on the next tick
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+
+if __name__ == "__main__":
+    print("=== Threaded Loading Cache ===")
+    backend_calls = []
+
+    def slow_loader(key):
+        backend_calls.append(key)
+        time.sleep(0.2)
+        return f"value-for-{key}"
+
+    writes = []
+    loading_cache = LoadingCache(Cache(LRUTTLEvictionStrategy(max_size=100), stats=CacheStats()), ttl=1,
+                                 writer=writes.append, write_batch_size=3, write_interval=0.5)
+
+    threads = [Thread(target=loading_cache.get, args=("user:1", slow_loader)) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print("10 concurrent misses -> backend calls:", len(backend_calls))
+
+    time.sleep(0.85)  # past 80% of the TTL
+    print("Stale-but-valid read:", loading_cache.get("user:1", slow_loader))
+    time.sleep(0.3)
+    print("Backend calls after refresh-ahead:", len(backend_calls))
+
+    for i in range(4):
+        loading_cache.put(f"user:{i}", i)
+    print("Batches written on reaching batch size:", writes)
+    loading_cache.close()
+    print("Batches after close:", writes)
+    print("Cache stats:", loading_cache.cache.stats())
+
+    print("\n=== asyncio Loading Cache ===")
+
+    async def async_demo():
+        async_calls = []
+
+        async def async_loader(key):
+            async_calls.append(key)
+            await asyncio.sleep(0.1)
+            return f"value-for-{key}"
+
+        async_writes = []
+
+        async def async_writer(batch):
+            async_writes.append(batch)
+
+        async_cache = AsyncLoadingCache(Cache(LRUTTLEvictionStrategy(max_size=100)), ttl=1, writer=async_writer)
+        await asyncio.gather(*(async_cache.get("user:1", async_loader) for _ in range(1000)))
+        print("1000 concurrent misses -> backend calls:", len(async_calls))
+        await async_cache.put("user:2", 2)
+        await async_cache.close()
+        print("Batches after close:", async_writes)
+
+    asyncio.run(async_demo())
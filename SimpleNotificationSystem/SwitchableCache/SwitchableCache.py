@@ -1,111 +1,652 @@
+import heapq
+import sys
 import time
-from collections import OrderedDict
+import weakref
+from array import array
+from collections import Counter, OrderedDict
 from abc import ABC, abstractmethod
+from itertools import count
+from threading import Lock, local
 
 
 class CacheStrategy(ABC):
     @abstractmethod
     def put(self, cache, key, value, ttl = None):
         pass
-    
+
     @abstractmethod
     def get(self, cache, key):
         pass
-    
+
     @abstractmethod
     def evict(self, cache):
         pass
 
+    def capacity_stats(self, cache, top_n = 5):
+        """
+        Capacity figures merged into Cache.stats(); strategies with limits beyond the entry
+        count override this.
+        """
+        return {}
+
+class _ThreadCounters:
+    __slots__ = ("hits", "misses", "loads", "load_failures", "load_time", "evictions",
+                 "aged_evictions", "eviction_age_total", "eviction_age_max", "until_sample")
+
+    def __init__(self, sample_every):
+        self.hits = self.misses = self.loads = self.load_failures = 0
+        self.load_time = 0.0
+        self.evictions = Counter()
+        self.aged_evictions = 0
+        self.eviction_age_total = self.eviction_age_max = 0.0
+        self.until_sample = sample_every
+
+    def merge(self, other):
+        self.hits += other.hits
+        self.misses += other.misses
+        self.loads += other.loads
+        self.load_failures += other.load_failures
+        self.load_time += other.load_time
+        self.evictions.update(other.evictions)
+        self.aged_evictions += other.aged_evictions
+        self.eviction_age_total += other.eviction_age_total
+        self.eviction_age_max = max(self.eviction_age_max, other.eviction_age_max)
+
+class _ThreadToken:
+    # Lives in a thread's local storage, so it is released when the thread exits.
+    __slots__ = ("__weakref__",)
+
+class CacheStats:
+    """
+    Hit/miss/load/eviction counters for a Cache. Each thread increments its own counter
+    object, so recording never takes a lock or contends with other threads; stats() sums
+    them into a snapshot (which may lag in-flight operations slightly). When a thread exits
+    its counters are folded into a retired total, so thread-per-request servers do not
+    accumulate one counter object per thread they ever ran.
+
+    An optional sampler(event, key, detail) is called for every sample_every-th event per
+    thread ("hit", "miss", "load" or "eviction"), e.g. to feed traces or histograms.
+    """
+
+    def __init__(self, sample_every = 0, sampler = None, clock = time.monotonic):
+        self.sample_every = sample_every if sampler is not None else 0
+        self.sampler = sampler
+        self.clock = clock
+        self._local = local()
+        self._live_counters = set()  # counters of threads that are still running
+        self._retired = _ThreadCounters(0)  # sum of counters from threads that have exited
+        self._register_lock = Lock()
+
+    def _counters(self):
+        try:
+            return self._local.counters
+        except AttributeError:
+            counters = self._local.counters = _ThreadCounters(self.sample_every)
+            token = self._local.token = _ThreadToken()
+            with self._register_lock:
+                self._live_counters.add(counters)
+            weakref.finalize(token, self._retire, counters)
+            return counters
+
+    def _retire(self, counters):
+        # Runs when the owning thread's local storage is released, i.e. the thread has exited.
+        with self._register_lock:
+            self._live_counters.discard(counters)
+            self._retired.merge(counters)
+
+    def _sample(self, counters, event, key, detail):
+        counters.until_sample -= 1
+        if counters.until_sample <= 0:
+            counters.until_sample = self.sample_every
+            self.sampler(event, key, detail)
+
+    def record_get(self, key, hit):
+        counters = self._counters()
+        if hit:
+            counters.hits += 1
+        else:
+            counters.misses += 1
+        if self.sample_every:
+            self._sample(counters, "hit" if hit else "miss", key, None)
+
+    def record_load(self, key, seconds, success = True):
+        counters = self._counters()
+        counters.loads += 1
+        counters.load_time += seconds
+        if not success:
+            counters.load_failures += 1
+        if self.sample_every:
+            self._sample(counters, "load", key, seconds)
+
+    def record_eviction(self, key, cause, age = None):
+        counters = self._counters()
+        counters.evictions[cause] += 1
+        if age is not None:
+            counters.aged_evictions += 1
+            counters.eviction_age_total += age
+            if age > counters.eviction_age_max:
+                counters.eviction_age_max = age
+        if self.sample_every:
+            self._sample(counters, "eviction", key, (cause, age))
+
+    def stats(self):
+        with self._register_lock:
+            retired = _ThreadCounters(0)
+            retired.merge(self._retired)
+            all_counters = [*self._live_counters, retired]
+        hits = sum(c.hits for c in all_counters)
+        misses = sum(c.misses for c in all_counters)
+        loads = sum(c.loads for c in all_counters)
+        load_time = sum(c.load_time for c in all_counters)
+        aged = sum(c.aged_evictions for c in all_counters)
+        evictions = Counter()
+        for c in all_counters:
+            evictions.update(c.evictions)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            "loads": loads,
+            "load_failures": sum(c.load_failures for c in all_counters),
+            "total_load_time": load_time,
+            "avg_load_time": load_time / loads if loads else None,
+            "evictions": dict(evictions),
+            "avg_eviction_age": sum(c.eviction_age_total for c in all_counters) / aged if aged else None,
+            "max_eviction_age": max((c.eviction_age_max for c in all_counters), default=None) if aged else None,
+        }
+
 class Cache:
-    def __init__(self, cache_strategy):
+    def __init__(self, cache_strategy, eviction_listener = None, stats = None):
+        """
+        :param cache_strategy: CacheStrategy deciding ordering, expiry and eviction.
+        :param eviction_listener: Optional callable(key, value, cause) invoked whenever the
+                                  strategy drops an entry ("expired", "size", "weight", ...).
+        :param stats: Optional CacheStats to record into; when None instrumentation costs one
+                      attribute check per call.
+        """
         self.cache_strategy = cache_strategy
         self.store = OrderedDict()
-    
+        self.eviction_listener = eviction_listener
+        self.stats_recorder = stats
+        self.inserted_at = {}  # key -> insertion time, tracked only while stats are enabled
+
     def put(self, key, value, ttl = None):
         self.cache_strategy.put(self, key, value, ttl)
-    
+        if self.stats_recorder is not None and key in self.store:
+            self.inserted_at[key] = self.stats_recorder.clock()
+
     def get(self, key):
-        self.cache_strategy.get(self, key)
-    
+        value = self.cache_strategy.get(self, key)
+        if self.stats_recorder is not None:
+            self.stats_recorder.record_get(key, value != -1)
+        return value
+
     def evict(self):
         self.cache_strategy.evict(self)
 
-class TimeEvictionStrategy(CacheStrategy):
-    DEFAULT_TTL = 15
+    def on_evicted(self, key, value, cause):
+        # Called by strategies after they remove an entry from the store.
+        recorder = self.stats_recorder
+        if recorder is not None:
+            inserted_at = self.inserted_at.pop(key, None)
+            age = recorder.clock() - inserted_at if inserted_at is not None else None
+            recorder.record_eviction(key, cause, age)
+        if self.eviction_listener is not None:
+            self.eviction_listener(key, value, cause)
+
+    def stats(self, top_n = 5):
+        """
+        Single stats snapshot: the entry count and the strategy's capacity figures (weight,
+        limits, the top_n heaviest entries), plus hit/miss/load/eviction counters when the
+        cache was created with a CacheStats. Finding the heaviest entries is O(n); pass
+        top_n=0 to skip it.
+        """
+        snapshot = self.stats_recorder.stats() if self.stats_recorder is not None else {}
+        snapshot["entries"] = len(self.store)
+        snapshot.update(self.cache_strategy.capacity_stats(self, top_n))
+        return snapshot
+
+def sizeof_weigher(key, value):
+    """
+    Default weigher: shallow sys.getsizeof of key and value. Exact for str/bytes/numbers;
+    pass a custom weigher for containers or objects that own large buffers.
+    """
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+class LRUTTLEvictionStrategy(CacheStrategy):
+    """
+    O(1) LRU ordering with optional per-entry TTL in a single OrderedDict.
+
+    Entries are stored as key -> (value, expires_at, weight). Expiry times are also pushed
+    onto a min-heap, so expired entries are removed in O(log n) each instead of scanning the
+    store. Heap entries for overwritten or LRU-evicted keys go stale and are skipped lazily.
+    Capacity can be bounded by entry count (max_size), by total weight (max_weight, using
+    `weigher`, bytes by default), or both. A strategy instance keeps the heap and the
+    weight total, so use one instance per Cache.
+    """
+
+    def __init__(self, max_size = None, default_ttl = None, clock = time.monotonic,
+                 max_weight = None, weigher = None):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.max_weight = max_weight
+        self.weigher = weigher if weigher is not None or max_weight is None else sizeof_weigher
+        self.total_weight = 0
+        self.expiry_heap = []  # (expires_at, seq, key)
+        self._seq = count()
 
     def put(self, cache, key, value, ttl = None):
-        ttl = ttl if ttl else TimeEvictionStrategy.DEFAULT_TTL
-        if ttl < 0: raise ValueError("ttl cannot be less than zero")
-        timestamp = time.time()
-        self.cache.store[key] = (value, timestamp, ttl)
-        cache.store.move_to_end(key)
-    
+        ttl = ttl if ttl else self.default_ttl
+        if ttl is not None and ttl < 0: raise ValueError("ttl cannot be less than zero")
+        store = cache.store
+        weight = self.weigher(key, value) if self.weigher is not None else 0
+        old = store.get(key)
+        if old is not None:
+            self.total_weight -= old[2]
+        if self.max_weight is not None and weight > self.max_weight:
+            # Caching it would flush everything else and still not fit.
+            if old is not None:
+                del store[key]
+            cache.on_evicted(key, value, "weight")
+            return
+        now = self.clock()
+        expires_at = now + ttl if ttl is not None else None
+        store[key] = (value, expires_at, weight)
+        self.total_weight += weight
+        # Move key to the end as most recently used.
+        store.move_to_end(key)
+        if expires_at is not None:
+            heapq.heappush(self.expiry_heap, (expires_at, next(self._seq), key))
+        self._expire(cache, now)
+        self._enforce_capacity(cache)
+
     def get(self, cache, key):
-        if key not self.cache.store:
-            print("key not found")
+        entry = cache.store.get(key)
+        if entry is None:
             return -1
-        value, timestamp, ttl = cache.store[key]
-        current_time = time.time()
-
-        if current_time - timestamp > ttl:
+        expires_at = entry[1]
+        if expires_at is not None and self.clock() >= expires_at:
             del cache.store[key]
+            self.total_weight -= entry[2]
+            cache.on_evicted(key, entry[0], "expired")
             return -1
         cache.store.move_to_end(key)
-        return value
-    
+        return entry[0]
+
     def evict(self, cache):
-        current_time = time.time()
-        expired_keys = [key for key, (val, timestamp, ttl) in cache.store.items()
-                        if current_time - timestamp > ttl]
-        for key in expired_keys:
-            del cache.store[key]
-            print(f"[TimeEviction] Evicted key '{key}' at time {current_time:.2f}")
+        self._expire(cache, self.clock())
+        self._enforce_capacity(cache)
 
-class SizeEvictionStrategy(CacheStrategy):
-    def __init__(self, max_size):
-        self.max_size = max_size
+    def _expire(self, cache, now):
+        heap = self.expiry_heap
+        store = cache.store
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = store.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del store[key]
+                self.total_weight -= entry[2]
+                cache.on_evicted(key, entry[0], "expired")
+        # Keep stale heap entries from outgrowing the store.
+        if len(heap) > 2 * len(store) + 64:
+            self.expiry_heap = [(entry[1], next(self._seq), key)
+                                for key, entry in store.items() if entry[1] is not None]
+            heapq.heapify(self.expiry_heap)
+
+    def _enforce_capacity(self, cache):
+        store = cache.store
+        if self.max_size is not None:
+            while len(store) > self.max_size:
+                self._evict_lru(cache, "size")
+        if self.max_weight is not None:
+            while self.total_weight > self.max_weight:
+                self._evict_lru(cache, "weight")
+
+    def _evict_lru(self, cache, cause):
+        key, entry = cache.store.popitem(last=False)
+        self.total_weight -= entry[2]
+        cache.on_evicted(key, entry[0], cause)
+
+    def capacity_stats(self, cache, top_n = 5):
+        # Eviction counts by cause come from the Cache's CacheStats, not from here.
+        largest = heapq.nlargest(top_n, ((entry[2], key) for key, entry in cache.store.items()),
+                                 key=lambda pair: pair[0]) if top_n else []
+        return {
+            "max_size": self.max_size,
+            "weight": self.total_weight,
+            "max_weight": self.max_weight,
+            "largest": [(key, weight) for weight, key in largest],
+        }
+
+class TimeEvictionStrategy(LRUTTLEvictionStrategy):
+    DEFAULT_TTL = 15
+
+    def __init__(self, clock = time.monotonic):
+        super().__init__(default_ttl=TimeEvictionStrategy.DEFAULT_TTL, clock=clock)
+
+class SizeEvictionStrategy(LRUTTLEvictionStrategy):
+    def __init__(self, max_size, clock = time.monotonic):
+        super().__init__(max_size=max_size, clock=clock)
 
     def put(self, cache, key, value, ttl=None):
         # TTL is ignored in size-based eviction.
+        super().put(cache, key, value)
+
+class LFUEvictionStrategy(CacheStrategy):
+    """
+    O(1) least-frequently-used eviction; ties within a frequency are broken by LRU order.
+    Keys are kept in per-frequency OrderedDicts and min_freq tracks the lowest non-empty one.
+    TTL is ignored. Use one instance per Cache.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.freq = {}  # key -> access count
+        self.buckets = {}  # access count -> OrderedDict of keys in LRU order
+        self.min_freq = 0
+
+    def _touch(self, key):
+        freq = self.freq[key]
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.freq[key] = freq + 1
+        self.buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+    def put(self, cache, key, value, ttl = None):
+        if self.max_size <= 0:
+            return
+        if key in cache.store:
+            cache.store[key] = value
+            self._touch(key)
+            return
+        if len(cache.store) >= self.max_size:
+            self._evict_one(cache)
         cache.store[key] = value
-        # Move key to the end as most recently used.
-        cache.store.move_to_end(key)
-        print(f"[SizeEviction] Put key '{key}' with value '{value}'.")
-        if len(cache.store) > self.max_size:
-            self.evict(cache)
+        self.freq[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_freq = 1
 
     def get(self, cache, key):
         if key not in cache.store:
-            print(f"[SizeEviction] Key '{key}' not found.")
             return -1
-        # Move key to the end as most recently used.
-        cache.store.move_to_end(key)
-        value = cache.store[key]
-        print(f"[SizeEviction] Key '{key}' accessed, value: {value}.")
-        return value
+        self._touch(key)
+        return cache.store[key]
 
     def evict(self, cache):
+        # Capacity is enforced on every put; this only trims a cache that is over max_size.
         while len(cache.store) > self.max_size:
-            evicted_key, evicted_value = cache.store.popitem(last=False)
-            print(f"[SizeEviction] Evicted key '{evicted_key}' due to size limit (max_size={self.max_size}).")
+            self._evict_one(cache)
+
+    def _evict_one(self, cache):
+        # Removes the least recently used among the least frequently used entries.
+        bucket = self.buckets[self.min_freq]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self.buckets[self.min_freq]
+        del self.freq[key]
+        cache.on_evicted(key, cache.store.pop(key), "size")
+
+class ARCEvictionStrategy(CacheStrategy):
+    """
+    Adaptive Replacement Cache. Resident keys are split between t1 (seen once recently) and
+    t2 (seen at least twice); the ghost lists b1/b2 remember keys recently evicted from each
+    and steer the target size p of t1, so the cache adapts between recency and frequency and
+    a one-off scan cannot flush t2. All operations are O(1). TTL is ignored.
+    Use one instance per Cache.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.p = 0
+        self.t1, self.t2 = OrderedDict(), OrderedDict()
+        self.b1, self.b2 = OrderedDict(), OrderedDict()
+
+    def get(self, cache, key):
+        if key in self.t1:
+            del self.t1[key]
+            self.t2[key] = None
+        elif key in self.t2:
+            self.t2.move_to_end(key)
+        else:
+            return -1
+        return cache.store[key]
+
+    def put(self, cache, key, value, ttl = None):
+        c = self.max_size
+        if c <= 0:
+            return
+        if key in self.t1 or key in self.t2:
+            cache.store[key] = value
+            self.get(cache, key)
+            return
+
+        if key in self.b1:
+            self.p = min(c, self.p + max(len(self.b2) // len(self.b1), 1))
+            self._replace(cache, key)
+            del self.b1[key]
+            self.t2[key] = None
+        elif key in self.b2:
+            self.p = max(0, self.p - max(len(self.b1) // len(self.b2), 1))
+            self._replace(cache, key)
+            del self.b2[key]
+            self.t2[key] = None
+        else:
+            l1 = len(self.t1) + len(self.b1)
+            total = l1 + len(self.t2) + len(self.b2)
+            if l1 == c:
+                if len(self.t1) < c:
+                    self.b1.popitem(last=False)
+                    self._replace(cache, key)
+                else:
+                    evicted, _ = self.t1.popitem(last=False)
+                    cache.on_evicted(evicted, cache.store.pop(evicted), "size")
+            elif total >= c:
+                if total == 2 * c:
+                    self.b2.popitem(last=False)
+                self._replace(cache, key)
+            self.t1[key] = None
+        cache.store[key] = value
+
+    def _replace(self, cache, key):
+        if self.t1 and (len(self.t1) > self.p or (key in self.b2 and len(self.t1) == self.p)):
+            evicted, _ = self.t1.popitem(last=False)
+            self.b1[evicted] = None
+        elif self.t2:
+            evicted, _ = self.t2.popitem(last=False)
+            self.b2[evicted] = None
+        else:
+            return
+        cache.on_evicted(evicted, cache.store.pop(evicted), "size")
+
+    def evict(self, cache):
+        # Capacity is enforced on every put; nothing is pending.
+        pass
+
+class CountMinSketch:
+    """
+    Approximate frequency counter with 4-bit-style saturating counters (capped at 15) and
+    periodic halving, so old popularity decays. Used as the TinyLFU admission filter.
+    """
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, capacity):
+        width = 1
+        while width < max(16, capacity):
+            width <<= 1
+        self.shift = 64 - width.bit_length() + 1
+        self.rows = [array("B", bytes(width)) for _ in range(self.DEPTH)]
+        self.sample_size = 10 * max(1, capacity)
+        self.additions = 0
+
+    def _indexes(self, key):
+        # One 64-bit mix of the key's hash, re-mixed per row.
+        h = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        shift = self.shift
+        return (h >> shift,
+                ((h ^ 0xC2B2AE3D27D4EB4F) * 0x2545F4914F6CDD1D & 0xFFFFFFFFFFFFFFFF) >> shift,
+                ((h ^ 0x165667B19E3779F9) * 0xBF58476D1CE4E5B9 & 0xFFFFFFFFFFFFFFFF) >> shift,
+                ((h ^ 0x27D4EB2F165667C5) * 0x94D049BB133111EB & 0xFFFFFFFFFFFFFFFF) >> shift)
+
+    def increment(self, key):
+        i0, i1, i2, i3 = self._indexes(key)
+        r0, r1, r2, r3 = self.rows
+        limit = self.MAX_COUNT
+        if r0[i0] < limit: r0[i0] += 1
+        if r1[i1] < limit: r1[i1] += 1
+        if r2[i2] < limit: r2[i2] += 1
+        if r3[i3] < limit: r3[i3] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key):
+        i0, i1, i2, i3 = self._indexes(key)
+        r0, r1, r2, r3 = self.rows
+        return min(r0[i0], r1[i1], r2[i2], r3[i3])
+
+    def _age(self):
+        self.rows = [array("B", bytes(c >> 1 for c in row)) for row in self.rows]
+        self.additions //= 2
+
+class WTinyLFUEvictionStrategy(CacheStrategy):
+    """
+    Window TinyLFU. New keys enter a small LRU window (1% of capacity); keys leaving the
+    window compete with the main region's LRU victim and are admitted only if the count-min
+    sketch estimates them as more frequent. The main region is a segmented LRU
+    (probation/protected), so scans never displace the frequently used working set.
+    All operations are O(1). TTL is ignored. Use one instance per Cache.
+    """
+
+    def __init__(self, max_size, window_ratio = 0.01, protected_ratio = 0.8):
+        self.max_size = max_size
+        self.window_size = max(1, int(max_size * window_ratio))
+        self.main_size = max(0, max_size - self.window_size)
+        self.protected_size = int(self.main_size * protected_ratio)
+        self.window, self.probation, self.protected = OrderedDict(), OrderedDict(), OrderedDict()
+        self.sketch = CountMinSketch(max_size)
+
+    def get(self, cache, key):
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.protected:
+            self.protected.move_to_end(key)
+        elif key in self.probation:
+            # A second hit promotes to protected, demoting protected's LRU if it is full.
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_size:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+        else:
+            return -1
+        return cache.store[key]
+
+    def put(self, cache, key, value, ttl = None):
+        if self.max_size <= 0:
+            return
+        if key in cache.store:
+            cache.store[key] = value
+            self.get(cache, key)
+            return
+        self.sketch.increment(key)
+        cache.store[key] = value
+        self.window[key] = None
+        if len(self.window) > self.window_size:
+            candidate, _ = self.window.popitem(last=False)
+            self._admit(cache, candidate)
+
+    def _admit(self, cache, candidate):
+        if len(self.probation) + len(self.protected) < self.main_size:
+            self.probation[candidate] = None
+            return
+        victims = self.probation if self.probation else self.protected
+        if not victims:
+            cache.on_evicted(candidate, cache.store.pop(candidate), "size")
+            return
+        victim = next(iter(victims))
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            del victims[victim]
+            cache.on_evicted(victim, cache.store.pop(victim), "size")
+            self.probation[candidate] = None
+        else:
+            cache.on_evicted(candidate, cache.store.pop(candidate), "rejected")
+
+    def evict(self, cache):
+        # Capacity is enforced on every put; nothing is pending.
+        pass
+
+class ConcurrentCache:
+    """
+    Thread-safe cache that partitions keys across independent segments. Each segment is a
+    Cache with its own strategy (and so its own LRU/TTL state) guarded by its own lock, so
+    threads touching different segments never contend.
+    """
+
+    def __init__(self, strategy_factory, num_segments = 16, stats = None):
+        if num_segments <= 0: raise ValueError("num_segments must be positive")
+        self.num_segments = num_segments
+        # Segments share one CacheStats; its per-thread counters need no extra locking.
+        self.stats_recorder = stats
+        self.segments = [Cache(strategy_factory(), stats=stats) for _ in range(num_segments)]
+        self.locks = [Lock() for _ in range(num_segments)]
+
+    def _segment_index(self, key):
+        return hash(key) % self.num_segments
+
+    def put(self, key, value, ttl = None):
+        index = self._segment_index(key)
+        with self.locks[index]:
+            self.segments[index].put(key, value, ttl)
+
+    def get(self, key):
+        index = self._segment_index(key)
+        # LRU reads reorder the segment, so they take the segment lock (never a global one).
+        with self.locks[index]:
+            return self.segments[index].get(key)
+
+    def evict(self):
+        for segment, lock in zip(self.segments, self.locks):
+            with lock:
+                segment.evict()
+
+    def __len__(self):
+        return sum(len(segment.store) for segment in self.segments)
+
+    def stats(self):
+        """
+        Counters from the shared CacheStats (when given) plus totals over all segments.
+        """
+        snapshot = self.stats_recorder.stats() if self.stats_recorder is not None else {}
+        snapshot["entries"] = len(self)
+        weights = [segment.cache_strategy.capacity_stats(segment, 0).get("weight") for segment in self.segments]
+        if None not in weights:
+            snapshot["weight"] = sum(weights)
+        return snapshot
 
 if __name__ == "__main__":
     print("=== Time-Based Eviction Strategy Tests ===")
     time_strategy = TimeEvictionStrategy()
     time_cache = Cache(time_strategy)
-    
+
     print("\n[Test 1: Immediate Access with default TTL]")
     time_cache.put("foo", "bar")  # Uses default TTL (15 seconds)
     print("Get 'foo':", time_cache.get("foo"))
-    
+
     print("\n[Test 2: Immediate Access with custom TTL=2]")
     time_cache.put("baz", "qux", ttl=2)
     print("Get 'baz':", time_cache.get("baz"))
-    
+
     print("\n[Test 3: Access After Expiry]")
     time.sleep(3)
     print("Get 'baz' after expiry:", time_cache.get("baz"))
-    
+
     print("\n[Test 4: Manual Eviction]")
     time_cache.put("alpha", 100, ttl=1)
     time_cache.put("beta", 200, ttl=5)
@@ -114,20 +655,72 @@ if __name__ == "__main__":
     print("Get 'beta':", time_cache.get("beta"))
     time_cache.evict()
     print("Current keys after eviction (TimeEviction):", list(time_cache.store.keys()))
-    
+
     print("\n=== Size-Based Eviction Strategy Tests ===")
     size_strategy = SizeEvictionStrategy(max_size=3)
     size_cache = Cache(size_strategy)
-    
+
     print("\n[Test 5: Size Limit Eviction]")
     size_cache.put("one", 1)
     size_cache.put("two", 2)
     size_cache.put("three", 3)
     print("Current keys:", list(size_cache.store.keys()))
-    
+
     # Inserting one more item should trigger eviction of the oldest entry.
     size_cache.put("four", 4)
     print("After adding 'four', current keys:", list(size_cache.store.keys()))
-    
+
     print("\n[Test 6: Accessing Existing Key]")
-    print("Get 'two':", size_cache.get("two"))
\ No newline at end of file
+    print("Get 'two':", size_cache.get("two"))
+
+    print("\n=== Combined LRU + TTL Strategy Tests ===")
+    lru_ttl_cache = Cache(LRUTTLEvictionStrategy(max_size=2, default_ttl=1))
+
+    print("\n[Test 7: Size and TTL Together]")
+    lru_ttl_cache.put("a", 1)
+    lru_ttl_cache.put("b", 2, ttl=10)
+    lru_ttl_cache.get("a")
+    lru_ttl_cache.put("c", 3)  # evicts 'b', the least recently used
+    print("Current keys:", list(lru_ttl_cache.store.keys()))
+    time.sleep(1.1)
+    lru_ttl_cache.evict()  # 'a' and 'c' have expired
+    print("Current keys after 1.1s:", list(lru_ttl_cache.store.keys()))
+
+    print("\n[Test 8: Byte-Weighted Capacity]")
+    weighted_strategy = LRUTTLEvictionStrategy(max_weight=1_000, weigher=lambda key, value: len(value))
+    weighted_cache = Cache(weighted_strategy, stats=CacheStats())
+    weighted_cache.put("small", b"x" * 10)
+    weighted_cache.put("medium", b"x" * 600)
+    weighted_cache.put("large", b"x" * 500)  # evicts 'small' then 'medium' to get under 1000 bytes
+    weighted_cache.put("blob", b"x" * 50_000_000)  # bigger than the whole budget: not cached
+    print("Stats:", weighted_cache.stats())
+
+    print("\n=== Concurrent Cache Tests ===")
+    concurrent_cache = ConcurrentCache(lambda: LRUTTLEvictionStrategy(max_size=2), num_segments=4)
+
+    print("\n[Test 9: Segmented Put/Get]")
+    for i in range(6):
+        concurrent_cache.put(f"key{i}", i)
+    print("Get 'key5':", concurrent_cache.get("key5"))
+    print("Entries across segments:", len(concurrent_cache))
+
+    print("\n=== Frequency-Aware Strategy Tests ===")
+    for strategy in (LFUEvictionStrategy(max_size=2), ARCEvictionStrategy(max_size=2),
+                     WTinyLFUEvictionStrategy(max_size=2)):
+        cache = Cache(strategy)
+        cache.put("hot", 1)
+        cache.get("hot")
+        cache.get("hot")
+        for scan_key in ("s1", "s2", "s3"):
+            cache.put(scan_key, 0)
+        print(f"{type(strategy).__name__}: 'hot' after a scan ->", cache.get("hot"))
+
+    print("\n=== Cache Statistics ===")
+    sampled = []
+    stats_cache = Cache(LRUTTLEvictionStrategy(max_size=2),
+                        stats=CacheStats(sample_every=3, sampler=lambda *event: sampled.append(event)))
+    for key in ("a", "b", "a", "c", "d", "a"):
+        if stats_cache.get(key) == -1:
+            stats_cache.put(key, key.upper())
+    print("Stats:", stats_cache.stats())
+    print("Sampled events:", sampled)
@@ -0,0 +1,273 @@
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from itertools import count
+from threading import Event, Lock, Thread
+
+from SwitchableCache import Cache, LRUTTLEvictionStrategy
+
+
+class _Segment:
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.file = open(path, "w+b")
+        self.file.truncate(size)  # pre-allocate so appends never grow the mapping
+        self.mmap = mmap.mmap(self.file.fileno(), size)
+        self.write_offset = 0
+        self.dead_bytes = 0
+        self.keys = set()  # keys whose live record is in this segment
+        self.retired = False
+
+    def close(self):
+        # Raises BufferError while a reader still holds a memoryview into this segment.
+        self.mmap.close()
+        self.file.close()
+        os.remove(self.path)
+
+
+class MmapSegmentStore:
+    """
+    Append-only on-disk key/value store made of pre-allocated, memory-mapped segment files
+    and an in-memory index of key -> (segment, offset, length, pickled, expires_at).
+
+    Bytes-like values are stored raw and returned as a zero-copy memoryview over the
+    mapping; any other value is pickled and returned unpickled. Overwrites and deletes only
+    mark the old record dead; a background thread compacts segments whose dead fraction
+    passes compact_threshold by copying their live records forward and unmapping them.
+    When more than max_segments exist the oldest is dropped whole, which bounds disk use.
+    A record put with a ttl is treated as missing once it expires and removed on that read.
+    """
+
+    def __init__(self, directory = None, segment_size = 64 * 1024 * 1024, max_segments = 16,
+                 compact_threshold = 0.5, compact_interval = 1.0, clock = time.monotonic):
+        self._owns_directory = directory is None
+        self.directory = directory if directory is not None else tempfile.mkdtemp(prefix="l2-cache-")
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.compact_threshold = compact_threshold
+        self.clock = clock
+        self.index = {}
+        self.segments = OrderedDict()  # segment id -> _Segment, oldest first
+        self.active = None
+        self.retired = []  # unmapped lazily once no memoryview references them
+        self.lock = Lock()
+        self._ids = count()
+        self._closed = Event()
+        self._compactor = None
+        if compact_interval:
+            self._compactor = Thread(target=self._compact_periodically, args=(compact_interval,), daemon=True)
+            self._compactor.start()
+
+    def put(self, key, value, ttl = None):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            data, pickled = value, False
+        else:
+            data, pickled = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), True
+        expires_at = self.clock() + ttl if ttl is not None else None
+        with self.lock:
+            self._remove(key)
+            self._append(key, data, pickled, expires_at)
+
+    def get(self, key):
+        with self.lock:
+            location = self.index.get(key)
+            if location is None:
+                return None
+            segment, offset, length, pickled, expires_at = location
+            if expires_at is not None and self.clock() >= expires_at:
+                self._remove(key)
+                return None
+            view = memoryview(segment.mmap)[offset:offset + length]
+        if not pickled:
+            return view
+        with view:
+            return pickle.loads(view)
+
+    def delete(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def _append(self, key, data, pickled, expires_at):
+        # Caller holds self.lock.
+        length = len(data)
+        segment = self.active
+        if segment is None or segment.write_offset + length > segment.size:
+            segment = self._roll(length)
+        offset = segment.write_offset
+        segment.mmap[offset:offset + length] = data
+        segment.write_offset += length
+        segment.keys.add(key)
+        self.index[key] = (segment, offset, length, pickled, expires_at)
+
+    def _remove(self, key):
+        # Caller holds self.lock.
+        location = self.index.pop(key, None)
+        if location is not None:
+            segment = location[0]
+            segment.keys.discard(key)
+            segment.dead_bytes += location[2]
+
+    def _roll(self, min_size):
+        segment_id = next(self._ids)
+        path = os.path.join(self.directory, f"segment-{segment_id:08d}.dat")
+        self.active = _Segment(path, max(self.segment_size, min_size))
+        self.segments[segment_id] = self.active
+        while len(self.segments) > self.max_segments:
+            _, oldest = self.segments.popitem(last=False)
+            for key in oldest.keys:
+                del self.index[key]
+            oldest.keys.clear()
+            self._retire(oldest)
+        return self.active
+
+    def _retire(self, segment):
+        segment.retired = True
+        self.retired.append(segment)
+        self._unmap_retired()
+
+    def _unmap_retired(self):
+        still_referenced = []
+        for segment in self.retired:
+            try:
+                segment.close()
+            except BufferError:
+                still_referenced.append(segment)
+        self.retired = still_referenced
+
+    def compact(self):
+        """
+        Copies live records out of mostly-dead segments and unmaps them; returns how many
+        segments were reclaimed.
+        """
+        reclaimed = 0
+        with self.lock:
+            candidates = [segment for segment in self.segments.values()
+                          if segment is not self.active
+                          and segment.dead_bytes >= self.compact_threshold * segment.write_offset]
+        for segment in candidates:
+            with self.lock:
+                if segment.retired:  # dropped as the oldest segment meanwhile
+                    continue
+                for key in list(segment.keys):
+                    if segment.retired:  # appending rolled over and dropped it
+                        break
+                    _, offset, length, pickled, expires_at = self.index[key]
+                    data = segment.mmap[offset:offset + length]
+                    self._remove(key)
+                    self._append(key, data, pickled, expires_at)
+                if segment.retired:
+                    continue
+                for segment_id, candidate in self.segments.items():
+                    if candidate is segment:
+                        del self.segments[segment_id]
+                        break
+                self._retire(segment)
+                reclaimed += 1
+        with self.lock:
+            self._unmap_retired()
+        return reclaimed
+
+    def _compact_periodically(self, interval):
+        while not self._closed.wait(interval):
+            self.compact()
+
+    def close(self):
+        self._closed.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self.lock:
+            for segment in self.segments.values():
+                self.retired.append(segment)
+            self.segments.clear()
+            self.index.clear()
+            self.active = None
+            self._unmap_retired()
+        if self._owns_directory and not self.retired:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class TwoLevelCache:
+    """
+    In-memory L1 Cache backed by an MmapSegmentStore L2. Entries evicted from L1 for
+    capacity reasons are demoted to disk instead of being lost; expired entries are not, and
+    a demoted entry keeps the rest of its TTL. L1 hits return the cached object, L2 hits
+    return the value read from disk (a zero-copy memoryview for bytes values) without
+    promoting it, so hot disk reads stay copy-free.
+    """
+
+    def __init__(self, l1_strategy, l2 = None):
+        self.l1 = Cache(l1_strategy, eviction_listener=self._demote)
+        self.l2 = l2 if l2 is not None else MmapSegmentStore()
+        # Same TTL resolution and clock as the L1 strategy, for keys that expire.
+        self.default_ttl = getattr(l1_strategy, "default_ttl", None)
+        self.clock = getattr(l1_strategy, "clock", time.monotonic)
+        self.expires_at = {}
+
+    def _demote(self, key, value, cause):
+        expires_at = self.expires_at.pop(key, None)
+        if cause == "expired":
+            return
+        if expires_at is None:
+            self.l2.put(key, value)
+            return
+        remaining = expires_at - self.clock()
+        if remaining > 0:
+            self.l2.put(key, value, ttl=remaining)
+
+    def put(self, key, value, ttl = None):
+        self.l2.delete(key)  # the L1 copy is now the only current one
+        ttl = ttl if ttl else self.default_ttl
+        if ttl is not None:
+            self.expires_at[key] = self.clock() + ttl
+        else:
+            self.expires_at.pop(key, None)
+        self.l1.put(key, value, ttl)
+
+    def get(self, key):
+        value = self.l1.get(key)
+        if value != -1:
+            return value
+        value = self.l2.get(key)
+        return -1 if value is None else value
+
+    def evict(self):
+        self.l1.evict()
+
+    def close(self):
+        self.l2.close()
+
+
+if __name__ == "__main__":
+    print("=== Two-Level Cache ===")
+    two_level = TwoLevelCache(LRUTTLEvictionStrategy(max_size=2),
+                              MmapSegmentStore(segment_size=1024, max_segments=4, compact_interval=0))
+    for i in range(5):
+        two_level.put(f"page:{i}", f"payload {i}".encode() * 10)
+    print("L1 keys:", list(two_level.l1.store.keys()))
+    print("L2 keys:", sorted(two_level.l2.index))
+
+    view = two_level.get("page:0")
+    print("L2 hit type:", type(view).__name__, "first bytes:", bytes(view[:9]))
+    view.release()
+
+    for _ in range(20):
+        two_level.put("page:0", b"rewritten" * 40)  # churn leaves dead records behind
+        two_level.put("page:9", {"structured": True})
+        two_level.put("page:8", 1)
+    print("Segments before compaction:", len(two_level.l2.segments))
+    print("Segments reclaimed by compaction:", two_level.l2.compact())
+    with two_level.get("page:0") as view:
+        print("Get 'page:0' from L2 after compaction:", bytes(view[:9]))
+    two_level.close()